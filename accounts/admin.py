@@ -1,4 +1,5 @@
 from django.contrib import admin
+from reporting.admin_tools import FastChangeListMixin
 from .models import Stand, Resident
 
 
@@ -6,7 +7,7 @@ from .models import Stand, Resident
 # STAND
 # ==============================
 @admin.register(Stand)
-class StandAdmin(admin.ModelAdmin):
+class StandAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = (
         "stand_numb",
         "street",
@@ -25,7 +26,7 @@ class StandAdmin(admin.ModelAdmin):
 # RESIDENT
 # ==============================
 @admin.register(Resident)
-class ResidentAdmin(admin.ModelAdmin):
+class ResidentAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = (
         "user",
         "stand",
@@ -43,3 +44,5 @@ class ResidentAdmin(admin.ModelAdmin):
         "email",
     )
     list_filter = ("stand__cluster",)
+    list_select_related = ("user", "stand")
+    autocomplete_fields = ("user", "stand")
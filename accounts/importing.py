@@ -0,0 +1,324 @@
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.gis.geos import Point
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+
+from .models import Resident, Stand
+
+REQUIRED_FIELDS = ["stand_numb", "phone"]
+REQUIRED_USER_FIELDS = ["username", "password"]
+
+
+# ==============================
+# STREAMING JSON
+# ==============================
+def iter_json_array(f, key=None, read_size=64 * 1024):
+    """Yield the items of a JSON array one at a time.
+
+    ``key`` selects the array inside a top-level object, e.g.
+    ``{"residents": [...]}``; without it the file must be an array. Only one
+    item (plus one read) is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    start = re.compile(r"\s*\[" if key is None else rf'"{re.escape(key)}"\s*:\s*\[')
+
+    buffer = ""
+    eof = False
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = f.read(read_size)
+        eof = not chunk
+        buffer += chunk
+
+    # Find the opening bracket of the array
+    while True:
+        fill()
+        match = start.search(buffer) if key else start.match(buffer)
+        if match:
+            pos = match.end()
+            break
+        if eof:
+            raise ValueError(f"No JSON array found for {key or 'document'}")
+
+    while True:
+        # Skip whitespace and separators between items
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = "", 0
+            fill()
+
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of file inside JSON array")
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            buffer, pos = buffer[pos:], 0
+            fill()
+            continue
+
+        if (
+            not isinstance(item, (dict, list, str))
+            and not eof
+            and (end == len(buffer) or buffer[end] not in " \t\r\n,]")
+        ):
+            # A number may be cut off by the read (33 of 333, 4.5 of 4.5e10);
+            # decode it again once a delimiter follows
+            buffer, pos = buffer[pos:], 0
+            fill()
+            continue
+
+        yield item
+        buffer, pos = buffer[end:], 0
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==============================
+# PASSWORD HASHING
+# ==============================
+def _init_worker():
+    # Spawned workers need the app registry before make_password()
+    django.setup()
+
+
+def password_pool(workers=None):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def hash_passwords(passwords, executor=None):
+    """Hash raw passwords, across ``executor``'s processes if given."""
+    if executor is None:
+        return [make_password(p) for p in passwords]
+    # Batch the tasks so pickling overhead doesn't dominate
+    chunksize = max(1, len(passwords) // 32)
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+# ==============================
+# IMPORT
+# ==============================
+class ResidentImporter:
+    """Bulk-create users and residents from resident records.
+
+    Rows that can't be imported are collected in ``errors`` as dicts with the
+    row index, stand number, username and reason, for a machine-readable
+    report.
+    """
+
+    def __init__(self, chunk_size=500, executor=None, dry_run=False):
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.dry_run = dry_run
+
+        self.stats = {"created": 0, "skipped": 0, "errors": 0}
+        self.errors = []
+
+        # One query each for everything per-row checks need
+        self.stands = dict(Stand.objects.values_list("stand_numb", "pk"))
+        self.occupied = set(Resident.objects.values_list("stand_id", flat=True))
+        self.seen_usernames = set()
+
+    def error(self, index, item, reason):
+        user = item.get("user") if isinstance(item, dict) else None
+        self.errors.append(
+            {
+                "index": index,
+                "stand_numb": (
+                    item.get("stand_numb") if isinstance(item, dict) else None
+                ),
+                "username": user.get("username") if isinstance(user, dict) else None,
+                "error": reason,
+            }
+        )
+        self.stats["errors"] += 1
+
+    def validate(self, index, item):
+        """Return the stand id for a valid row, or None (recording why)."""
+        if not isinstance(item, dict) or not isinstance(item.get("user"), dict):
+            self.error(index, item, "Malformed record")
+            return None
+
+        missing = [f for f in REQUIRED_FIELDS if not item.get(f)] + [
+            f"user.{f}" for f in REQUIRED_USER_FIELDS if not item["user"].get(f)
+        ]
+        if missing:
+            self.error(index, item, f"Missing fields: {', '.join(missing)}")
+            return None
+
+        stand_id = self.stands.get(item["stand_numb"])
+        if stand_id is None:
+            self.error(index, item, f"Stand {item['stand_numb']} not found")
+            return None
+
+        if stand_id in self.occupied:
+            self.stats["skipped"] += 1
+            return None
+
+        username = item["user"]["username"]
+        if username in self.seen_usernames:
+            self.error(index, item, f"Duplicate username {username}")
+            return None
+
+        return stand_id
+
+    def run(self, items):
+        for chunk in chunked(enumerate(items), self.chunk_size):
+            self.import_chunk(chunk)
+        return self.stats
+
+    def import_chunk(self, chunk):
+        rows = []
+        for index, item in chunk:
+            stand_id = self.validate(index, item)
+            if stand_id is not None:
+                rows.append((index, item, stand_id))
+                self.seen_usernames.add(item["user"]["username"])
+                self.occupied.add(stand_id)
+
+        existing = set(
+            User.objects.filter(
+                username__in=[item["user"]["username"] for _, item, _ in rows]
+            ).values_list("username", flat=True)
+        )
+        for index, item, stand_id in rows:
+            if item["user"]["username"] in existing:
+                self.error(index, item, "Username already exists")
+                self.occupied.discard(stand_id)
+        rows = [row for row in rows if row[1]["user"]["username"] not in existing]
+
+        if not rows:
+            return
+        if self.dry_run:
+            self.stats["created"] += len(rows)
+            return
+
+        passwords = hash_passwords(
+            [item["user"]["password"] for _, item, _ in rows], self.executor
+        )
+        users = [
+            User(
+                username=item["user"]["username"],
+                email=item["user"].get("email", ""),
+                first_name=item["user"].get("first_name", ""),
+                last_name=item["user"].get("last_name", ""),
+                password=password,
+            )
+            for (_, item, _), password in zip(rows, passwords)
+        ]
+
+        try:
+            # A savepoint per chunk: a bad chunk doesn't undo earlier ones
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                Resident.objects.bulk_create(
+                    Resident(
+                        user=user,
+                        stand_id=stand_id,
+                        phone=item["phone"],
+                        alternative_phone=item.get("alternative_phone"),
+                        email=item.get("email") or item["user"].get("email"),
+                    )
+                    for user, (_, item, stand_id) in zip(users, rows)
+                )
+        except DatabaseError as e:
+            for index, item, stand_id in rows:
+                self.error(index, item, f"Chunk failed: {e}")
+                self.occupied.discard(stand_id)
+            return
+
+        self.stats["created"] += len(rows)
+
+
+# ==============================
+# STANDS
+# ==============================
+STAND_FIELDS = ["street", "latitude", "longitude", "dev_status"]
+
+
+def stand_values(feature):
+    """The Stand field values a GeoJSON point feature describes."""
+    props = feature["properties"]
+    longitude, latitude = feature["geometry"]["coordinates"][:2]
+    return {
+        "street": props.get("street"),
+        "latitude": latitude,
+        "longitude": longitude,
+        "dev_status": props.get("dev_status", True),
+    }
+
+
+def sync_stands(features, batch_size=1000, dry_run=False):
+    """Insert new stands and update changed ones; unchanged rows aren't written.
+
+    Returns counts of inserted, updated, unchanged and skipped features.
+    """
+    existing = {
+        stand.stand_numb: stand
+        for stand in Stand.objects.only("stand_numb", *STAND_FIELDS)
+    }
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    new, changed = {}, {}
+
+    for feature in features:
+        stand_numb = feature["properties"].get("stand_numb")
+        if not stand_numb:
+            stats["skipped"] += 1
+            continue
+
+        values = stand_values(feature)
+        stand = existing.get(stand_numb)
+        if stand is None:
+            # Last feature wins if a stand number repeats, like update_or_create
+            new[stand_numb] = Stand(stand_numb=stand_numb, **values)
+        elif any(getattr(stand, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(stand, field, value)
+            changed[stand_numb] = stand
+        elif stand_numb not in changed:
+            stats["unchanged"] += 1
+
+    # bulk_* skip save(), so set the point here
+    for stand in [*new.values(), *changed.values()]:
+        stand.location = Point(stand.longitude, stand.latitude, srid=4326)
+
+    stats["inserted"] = len(new)
+    stats["updated"] = len(changed)
+    if dry_run:
+        return stats
+
+    with transaction.atomic():
+        # update_conflicts covers stands created since we loaded existing
+        Stand.objects.bulk_create(
+            new.values(),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["stand_numb"],
+            update_fields=STAND_FIELDS + ["location"],
+        )
+        Stand.objects.bulk_update(
+            changed.values(), STAND_FIELDS + ["location"], batch_size=batch_size
+        )
+    return stats
@@ -1,10 +1,8 @@
 import json
 import os
 from django.core.management.base import BaseCommand
-from django.contrib.auth.models import User
-from django.db import transaction
 from django.conf import settings
-from accounts.models import Stand, Resident
+from accounts.importing import ResidentImporter, iter_json_array, password_pool
 
 
 class Command(BaseCommand):
@@ -14,12 +12,30 @@ class Command(BaseCommand):
         parser.add_argument(
             "--file",
             type=str,
-            default="accounts/data/residents_clean.json",
+            default="accounts/data/residents.json",
             help="Path to cleaned JSON file",
         )
         parser.add_argument(
             "--dry-run", action="store_true", help="Test without saving"
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Residents created per bulk insert",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Password hashing processes (default: one per CPU, 0 to disable)",
+        )
+        parser.add_argument(
+            "--error-report",
+            type=str,
+            default=None,
+            help="Write rows that failed to import to this JSON file",
+        )
 
     def handle(self, *args, **kwargs):
         file_path = kwargs["file"]
@@ -29,58 +45,38 @@ class Command(BaseCommand):
         if not os.path.isabs(file_path):
             file_path = os.path.join(settings.BASE_DIR, file_path)
 
-        # Load JSON
-        with open(file_path, "r") as f:
-            data = json.load(f)
-
-        stats = {"created": 0, "skipped": 0, "errors": 0}
-
-        with transaction.atomic():
-            for item in data["residents"]:
-                try:
-                    stand = Stand.objects.get(stand_numb=item["stand_numb"])
-
-                    # Check if resident exists
-                    if Resident.objects.filter(stand=stand).exists():
-                        stats["skipped"] += 1
-                        continue
-
-                    if not dry_run:
-                        # Create user
-                        user = User.objects.create_user(
-                            username=item["user"]["username"],
-                            email=item["user"]["email"],
-                            first_name=item["user"]["first_name"],
-                            last_name=item["user"]["last_name"],
-                            password=item["user"]["password"],
-                        )
-
-                        # Create resident
-                        Resident.objects.create(
-                            user=user,
-                            stand=stand,
-                            phone=item["phone"],
-                            monthly_fee=item["monthly_fee"],
-                            current_balance=item["current_balance"],
-                            last_payment_date=item["last_payment_date"],
-                            account_status=item["account_status"],
-                        )
+        executor = None
+        if not dry_run and kwargs["workers"] != 0:
+            executor = password_pool(kwargs["workers"])
 
-                    stats["created"] += 1
+        try:
+            importer = ResidentImporter(
+                chunk_size=kwargs["chunk_size"], executor=executor, dry_run=dry_run
+            )
+            with open(file_path, "r") as f:
+                stats = importer.run(iter_json_array(f, key="residents"))
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-                except Stand.DoesNotExist:
-                    self.stdout.write(
-                        self.style.WARNING(f"Stand {item['stand_numb']} not found")
-                    )
-                    stats["errors"] += 1
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f"Error: {e}"))
-                    stats["errors"] += 1
+        for error in importer.errors[:20]:
+            self.stdout.write(
+                self.style.WARNING(f"Row {error['index']}: {error['error']}")
+            )
+        if len(importer.errors) > 20:
+            self.stdout.write(f"... and {len(importer.errors) - 20} more")
 
-            if dry_run:
-                transaction.set_rollback(True)
+        if kwargs["error_report"]:
+            with open(kwargs["error_report"], "w") as f:
+                json.dump(
+                    {"file": file_path, "stats": stats, "errors": importer.errors},
+                    f,
+                    indent=2,
+                )
+            self.stdout.write(f"Error report written to {kwargs['error_report']}")
 
         # Summary
-        self.stdout.write(f"\n✅ Created: {stats['created']}")
+        prefix = "Would create" if dry_run else "Created"
+        self.stdout.write(f"\n✅ {prefix}: {stats['created']}")
         self.stdout.write(f"⏭️ Skipped: {stats['skipped']}")
         self.stdout.write(f"❌ Errors: {stats['errors']}")
@@ -1,7 +1,7 @@
 import json
 from django.core.management.base import BaseCommand
-from django.contrib.gis.geos import Point
-from accounts.models import Stand
+from accounts.importing import sync_stands
+from reporting import tiles
 
 
 class Command(BaseCommand):
@@ -9,6 +9,12 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("geojson_file", type=str)
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows per bulk query"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report changes without saving"
+        )
 
     def handle(self, *args, **kwargs):
         file_path = kwargs["geojson_file"]
@@ -16,24 +22,20 @@ class Command(BaseCommand):
         with open(file_path) as f:
             data = json.load(f)
 
-        for feature in data["features"]:
-            props = feature["properties"]
-            coords = feature["geometry"]["coordinates"]
-
-            longitude = coords[0]
-            latitude = coords[1]
-
-            point = Point(longitude, latitude, srid=4326)
-
-            Stand.objects.update_or_create(
-                stand_numb=props.get("stand_numb"),
-                defaults={
-                    "street": props.get("street"),
-                    "latitude": latitude,
-                    "longitude": longitude,
-                    "dev_status": props.get("dev_status", True),
-                    "location": point,
-                },
+        stats = sync_stands(
+            data["features"],
+            batch_size=kwargs["batch_size"],
+            dry_run=kwargs["dry_run"],
+        )
+
+        # Bulk writes skip the Stand signals, so drop the cached tiles here
+        if not kwargs["dry_run"] and (stats["inserted"] or stats["updated"]):
+            tiles.bump_layer("stands")
+
+        prefix = "Dry run: " if kwargs["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{stats['inserted']} inserted, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['skipped']} skipped"
             )
-
-        self.stdout.write(self.style.SUCCESS("Stands imported successfully"))
+        )
@@ -1,3 +1,119 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from reporting import tiles
+
+from .importing import chunked, iter_json_array, sync_stands
+from .models import Stand
+
+
+class IterJsonArrayTests(SimpleTestCase):
+    def items(self, text, **kwargs):
+        return list(iter_json_array(io.StringIO(text), **kwargs))
+
+    def test_top_level_array(self):
+        self.assertEqual(
+            self.items('[{"a": 1}, {"b": [2, 3]}]'), [{"a": 1}, {"b": [2, 3]}]
+        )
+
+    def test_keyed_array(self):
+        text = '{"meta": {"n": 2}, "residents": [{"id": 1}, {"id": 2}]}'
+        self.assertEqual(self.items(text, key="residents"), [{"id": 1}, {"id": 2}])
+
+    def test_empty_array(self):
+        self.assertEqual(self.items(" [ ] "), [])
+
+    def test_items_split_across_reads(self):
+        data = [{"name": "x" * 10, "n": i} for i in range(5)]
+        text = str(data).replace("'", '"')
+        for read_size in (1, 2, 3, 7):
+            with self.subTest(read_size=read_size):
+                self.assertEqual(self.items(text, read_size=read_size), data)
+
+    def test_scalars_split_across_reads(self):
+        for read_size in (1, 2, 3, 4):
+            with self.subTest(read_size=read_size):
+                self.assertEqual(
+                    self.items(
+                        "[1, 22, 333, -4.5e10, true, null]", read_size=read_size
+                    ),
+                    [1, 22, 333, -4.5e10, True, None],
+                )
+
+    def test_scalar_at_end_of_truncated_file(self):
+        with self.assertRaises(ValueError):
+            self.items("[1, 22", read_size=2)
+
+    def test_missing_array(self):
+        with self.assertRaises(ValueError):
+            self.items('{"other": []}', key="residents")
+
+    def test_invalid_item(self):
+        with self.assertRaises(ValueError):
+            self.items("[1, {oops}]")
+
+
+class ChunkedTests(SimpleTestCase):
+    def test_last_chunk_is_partial(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+def stand_feature(stand_numb, lon=31.05, lat=-17.8, **props):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": {"stand_numb": stand_numb, **props},
+    }
+
+
+class SyncStandsTests(TestCase):
+    def setUp(self):
+        Stand.objects.create(
+            stand_numb="1", street="Old Rd", latitude=-17.8, longitude=31.05
+        )
+        Stand.objects.create(
+            stand_numb="2", street="Main Rd", latitude=-17.81, longitude=31.06
+        )
+
+    def test_inserts_updates_and_skips(self):
+        features = [
+            stand_feature("1", street="New Rd", lon=31.07),
+            stand_feature("2", street="Main Rd", lon=31.06, lat=-17.81),
+            stand_feature("3", street="Side Rd"),
+            stand_feature(""),
+        ]
+
+        stats = sync_stands(features)
+
+        self.assertEqual(
+            stats, {"inserted": 1, "updated": 1, "unchanged": 1, "skipped": 1}
+        )
+        moved = Stand.objects.get(stand_numb="1")
+        self.assertEqual(moved.street, "New Rd")
+        self.assertAlmostEqual(moved.location.x, 31.07)
+        self.assertEqual(Stand.objects.get(stand_numb="3").location.y, -17.8)
+
+    def test_dry_run_writes_nothing(self):
+        stats = sync_stands(
+            [stand_feature("1", street="New Rd"), stand_feature("3")], dry_run=True
+        )
+
+        self.assertEqual((stats["inserted"], stats["updated"]), (1, 1))
+        self.assertEqual(Stand.objects.get(stand_numb="1").street, "Old Rd")
+        self.assertFalse(Stand.objects.filter(stand_numb="3").exists())
+
+    def test_command_drops_cached_stand_tiles(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".geojson") as f:
+            json.dump({"features": [stand_feature("3")]}, f)
+            f.flush()
+            out = io.StringIO()
+            with mock.patch.object(tiles, "bump_layer") as bump_layer:
+                call_command("import_stands", f.name, stdout=out)
+
+        bump_layer.assert_called_once_with("stands")
+        self.assertIn("1 inserted, 0 updated, 0 unchanged, 0 skipped", out.getvalue())
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import SEARCH_VAR
 from .models import (
     Community,
     Profile,
@@ -6,8 +7,10 @@ from .models import (
     PropertyReport,
     ReportImage,
     ReportComment,
+    SlowQuery,
 )
-
+from .admin_tools import ActiveRelatedListFilter, FastChangeListMixin, RecentInline
+from .search import RANK_ORDERING, search_reports
 
 # ==============================
 # COMMUNITY
@@ -26,10 +29,12 @@ class CommunityAdmin(admin.ModelAdmin):
 
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ("user", "user_type", "house_number", "phone")
     list_filter = ("user_type",)
+    list_select_related = ("user",)
     search_fields = ("user__username", "house_number")
+    autocomplete_fields = ("user",)
 
 
 # ==============================
@@ -49,14 +54,26 @@ class ViolationTypeAdmin(admin.ModelAdmin):
 # ==============================
 
 
-class ReportImageInline(admin.TabularInline):
+class ReportImageInline(RecentInline):
     model = ReportImage
-    extra = 1
 
 
-class ReportCommentInline(admin.TabularInline):
+class ReportCommentInline(RecentInline):
     model = ReportComment
-    extra = 1
+    autocomplete_fields = ("user",)
+    inline_select_related = ("user",)
+
+
+# ==============================
+# LIST FILTERS
+# ==============================
+
+
+class ActiveViolationFilter(ActiveRelatedListFilter):
+    title = "violation"
+    parameter_name = "violation"
+    related_model = ViolationType
+    field = "violation"
 
 
 # ==============================
@@ -65,7 +82,7 @@ class ReportCommentInline(admin.TabularInline):
 
 
 @admin.register(PropertyReport)
-class PropertyReportAdmin(admin.ModelAdmin):
+class PropertyReportAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = (
         "report_id",
         "house_number",
@@ -75,12 +92,38 @@ class PropertyReportAdmin(admin.ModelAdmin):
         "fine_paid",
         "created_at",
     )
-    list_filter = ("status", "fine_paid", "violation")
-    search_fields = ("house_number", "report_id")
+    list_filter = ("status", "fine_paid", ActiveViolationFilter)
+    list_select_related = ("violation",)
+    list_only = (
+        "report_id",
+        "house_number",
+        "violation__name",
+        "violation__fine_amount",
+        "status",
+        "fine_amount",
+        "fine_paid",
+        "created_at",
+    )
+    autocomplete_fields = ("violation", "reported_by", "stand")
+    # Searched through the full-text/trigram indexes, see get_search_results
+    search_fields = ("house_number", "description")
+    search_help_text = "House number, violation, description or comment text"
     readonly_fields = ("report_id", "created_at")
 
     inlines = [ReportImageInline, ReportCommentInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_reports(queryset, search_term), False
+
+    def get_ordering(self, request):
+        # Best matches first unless a column was clicked; a blank term is
+        # not searched, so there is no rank to order by
+        if request.GET.get(SEARCH_VAR, "").strip():
+            return RANK_ORDERING
+        return super().get_ordering(request)
+
 
 # ==============================
 # REPORT IMAGE
@@ -88,8 +131,11 @@ class PropertyReportAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReportImage)
-class ReportImageAdmin(admin.ModelAdmin):
+class ReportImageAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ("report", "uploaded_at")
+    list_select_related = ("report",)
+    list_only = ("report__house_number", "report__status", "uploaded_at")
+    autocomplete_fields = ("report",)
 
 
 # ==============================
@@ -98,6 +144,30 @@ class ReportImageAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReportComment)
-class ReportCommentAdmin(admin.ModelAdmin):
+class ReportCommentAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ("report", "user", "created_at")
+    list_select_related = ("report", "user")
+    list_only = (
+        "report__house_number",
+        "report__status",
+        "user__username",
+        "created_at",
+    )
     search_fields = ("user__username",)
+    autocomplete_fields = ("report", "user")
+
+
+# ==============================
+# SLOW QUERY LOG
+# ==============================
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(FastChangeListMixin, admin.ModelAdmin):
+    list_display = ("created_at", "duration_ms", "origin", "database", "fingerprint")
+    list_filter = ("database", "origin")
+    search_fields = ("sql", "origin", "fingerprint")
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,149 @@
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.paginator import Paginator
+from django.db import connections
+from django.forms.models import BaseInlineFormSet
+from django.urls import NoReverseMatch, reverse
+from django.utils.functional import cached_property
+
+# Above this many rows an unfiltered changelist shows the planner's
+# estimate instead of running COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 10000)
+
+# Existing rows shown by RecentInline
+RECENT_INLINE_LIMIT = 10
+
+
+# ==============================
+# PAGINATION
+# ==============================
+def estimated_count(queryset):
+    """pg_class.reltuples for the queryset's table, or None if unknown."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # -1 (PostgreSQL 14+) or 0 means never analyzed
+    return int(row[0]) if row and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses the table estimate for unfiltered querysets on big tables.
+
+    Filtered changelists (search, list_filter) still get an exact count.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class FastChangeListMixin:
+    """Estimated counts, and no second COUNT(*) for "N total" when filtering."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Columns the changelist needs; only() is applied when rendering the
+    # list, so change forms, actions (POST) and list_editable saves still
+    # load whole rows, e.g. for the delete signals
+    list_only = None
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = getattr(request, "resolver_match", None)
+        if (
+            self.list_only
+            and request.method == "GET"
+            and match
+            and match.url_name.endswith("_changelist")
+        ):
+            queryset = queryset.only(*self.list_only)
+        return queryset
+
+
+# ==============================
+# INLINES
+# ==============================
+class RecentInlineFormSet(BaseInlineFormSet):
+    """Only the first ``limit`` related rows in the inline's ordering.
+
+    The template says how many there are in total and links to the related
+    model's changelist, filtered to this instance, for the rest.
+    """
+
+    limit = RECENT_INLINE_LIMIT
+
+    def get_queryset(self):
+        if not hasattr(self, "_recent_queryset"):
+            self._recent_queryset = super().get_queryset()[: self.limit]
+        return self._recent_queryset
+
+    @cached_property
+    def total_count(self):
+        if self.instance.pk is None:
+            return 0
+        return super().get_queryset().count()
+
+    @cached_property
+    def changelist_url(self):
+        opts = self.model._meta
+        try:
+            url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+        except NoReverseMatch:
+            return None
+        return f"{url}?{self.fk.name}__id__exact={self.instance.pk}"
+
+
+class RecentInline(admin.TabularInline):
+    """Tabular inline that renders only the most recent rows."""
+
+    formset = RecentInlineFormSet
+    template = "admin/edit_inline/recent_tabular.html"
+    ordering = ("-pk",)
+    extra = 1
+    limit = RECENT_INLINE_LIMIT
+    inline_select_related = ()
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.limit = self.limit
+        return formset
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(*self.inline_select_related)
+
+
+class ActiveRelatedListFilter(admin.SimpleListFilter):
+    """Filter on a FK listing only active targets, loading just id and name.
+
+    Subclasses set ``title``, ``parameter_name``, ``related_model`` and
+    ``field``.
+    """
+
+    related_model = None
+    field = None
+
+    def lookups(self, request, model_admin):
+        return self.related_model.objects.filter(is_active=True).values_list(
+            "id", "name"
+        )
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f"Invalid {self.parameter_name}")
+        return queryset.filter(**{f"{self.field}_id": value})
@@ -0,0 +1,148 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+
+
+# ==============================
+# RESULT TYPES
+# ==============================
+@dataclass
+class ViolationCount:
+    name: str
+    count: int
+
+
+@dataclass
+class DashboardStats:
+    total_reports: int = 0
+    status_counts: dict = field(default_factory=dict)
+    total_fines: Decimal = Decimal("0")
+    monthly_counts: list = field(default_factory=lambda: [0] * 12)
+    violations: list = field(default_factory=list)
+
+    @property
+    def open_reports(self):
+        return self.status_counts.get("OPEN", 0)
+
+    @property
+    def resolved_reports(self):
+        return self.status_counts.get("RESOLVED", 0)
+
+
+# ==============================
+# AGGREGATION
+# ==============================
+def _statuses():
+    from .models import PropertyReport
+
+    return [code for code, _ in PropertyReport.STATUS_CHOICES]
+
+
+def _summary(rows, measure, fine_field, monthly):
+    """Totals, per-status counts, fines and the histogram in one query."""
+    statuses = _statuses()
+
+    aggregates = {
+        "total": measure(None),
+        "fines": Sum(fine_field),
+    }
+    for code in statuses:
+        aggregates[f"status_{code}"] = measure(Q(status=code))
+    if monthly:
+        for month in range(1, 13):
+            aggregates[f"month_{month}"] = measure(Q(report_date__month=month))
+
+    row = rows.order_by().aggregate(**aggregates)
+
+    stats = DashboardStats(
+        total_reports=row["total"] or 0,
+        status_counts={code: row[f"status_{code}"] or 0 for code in statuses},
+        total_fines=row["fines"] or Decimal("0"),
+    )
+    if monthly:
+        stats.monthly_counts = [row[f"month_{month}"] or 0 for month in range(1, 13)]
+    return stats
+
+
+def _violation_counts(rows, measure, top_violations):
+    violation_data = (
+        rows.order_by()
+        .values("violation__name")
+        .annotate(count=measure(None))
+        .filter(count__gt=0)
+        .order_by("-count")
+    )
+    if top_violations:
+        violation_data = violation_data[:top_violations]
+
+    return [
+        ViolationCount(name=v["violation__name"], count=v["count"])
+        for v in violation_data
+    ]
+
+
+def _build_stats(rows, measure, fine_field, monthly, top_violations):
+    """Shared conditional-aggregation core.
+
+    ``measure(q)`` returns the aggregate that counts reports matching ``q``;
+    this lets the same code run over raw reports and over the daily rollup.
+    """
+    stats = _summary(rows, measure, fine_field, monthly)
+    stats.violations = _violation_counts(rows, measure, top_violations)
+    return stats
+
+
+def report_stats(reports, monthly=True, top_violations=None):
+    """Compute every dashboard number for a PropertyReport queryset.
+
+    Totals, per-status counts, the fine sum and (optionally) the 12-month
+    histogram come back from a single conditional-aggregation query; the
+    violation breakdown is a second query because it groups at another grain.
+    """
+    return _build_stats(
+        reports,
+        lambda q: Count("id", filter=q),
+        "fine_amount",
+        monthly,
+        top_violations,
+    )
+
+
+def _rollup_rows(year, month):
+    from .filters import filter_period
+    from .models import ReportDailyStats
+
+    return filter_period(ReportDailyStats.objects.all(), year, month)
+
+
+def _rollup_measure(q):
+    return Sum("report_count", filter=q)
+
+
+def rollup_stats(year=None, month=None, monthly=True, top_violations=None):
+    """Same numbers as ``report_stats`` but read from ReportDailyStats.
+
+    Cost depends on the number of (day, violation, status) rows in the
+    period rather than on the number of reports.
+    """
+    return _build_stats(
+        _rollup_rows(year, month),
+        _rollup_measure,
+        "fine_total",
+        monthly,
+        top_violations,
+    )
+
+
+def rollup_stats_parts(year=None, month=None, monthly=True, top_violations=None):
+    """``rollup_stats`` as independent callables: (summary, violation counts).
+
+    Async views run them concurrently with ``async_db.gather_queries`` and
+    set ``summary.violations`` from the second result.
+    """
+    rows = _rollup_rows(year, month)
+    return (
+        lambda: _summary(rows, _rollup_measure, "fine_total", monthly),
+        lambda: _violation_counts(rows, _rollup_measure, top_violations),
+    )
@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+# Threads (and so at most this many extra connections per process) for
+# queries run concurrently by async views
+ASYNC_DB_WORKERS = getattr(settings, "ASYNC_DB_WORKERS", 4)
+
+# Seconds a worker thread keeps its connection. Independent of
+# CONN_MAX_AGE, which stays 0 for ASGI request threads (they are not reused)
+ASYNC_DB_CONN_MAX_AGE = getattr(settings, "ASYNC_DB_CONN_MAX_AGE", 300)
+
+# False runs gathered queries one after another on the request's thread,
+# e.g. to compare both with benchmark_asgi
+ASYNC_DB_CONCURRENT = getattr(settings, "ASYNC_DB_CONCURRENT", True)
+
+_executor = ThreadPoolExecutor(
+    max_workers=ASYNC_DB_WORKERS, thread_name_prefix="async-db"
+)
+
+
+def _keep_new_connections():
+    """Give connections opened on this worker ASYNC_DB_CONN_MAX_AGE to live."""
+    for connection in connections.all(initialized_only=True):
+        raw = connection.connection
+        if raw is not None and getattr(connection, "_async_db_raw", None) is not raw:
+            connection._async_db_raw = raw
+            connection.close_at = time.monotonic() + ASYNC_DB_CONN_MAX_AGE
+
+
+def on_worker_connection(func):
+    """Wrap ``func`` to run on the worker thread's long-lived connection.
+
+    Connections are reused between calls and closed like request ones when
+    they become unusable or reach their age.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _keep_new_connections()
+            close_old_connections()
+
+    return wrapper
+
+
+def close_worker_connections():
+    """Close every worker's connection, e.g. before dropping a test database.
+
+    The barrier keeps each task on its own thread, so every worker is reached.
+    """
+    barrier = threading.Barrier(ASYNC_DB_WORKERS)
+
+    def close(_):
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        connections.close_all()
+
+    list(_executor.map(close, range(ASYNC_DB_WORKERS)))
+
+
+async def gather_queries(*funcs):
+    """Run independent blocking ORM calls at the same time; results in order.
+
+    The async ORM (``acount``, ``aaggregate``...) funnels every call through
+    one shared thread and connection, so awaiting several of them with
+    ``asyncio.gather`` still runs them one after another. Here each callable
+    runs on a small dedicated pool whose threads keep their connections,
+    so concurrency costs no connection setup per query.
+
+    The calls do not share the request's transaction, so use this only for
+    reads that don't need to see the request's own uncommitted writes.
+    """
+    if not ASYNC_DB_CONCURRENT:
+        return await sync_to_async(lambda: [func() for func in funcs])()
+    return await asyncio.gather(
+        *(
+            sync_to_async(
+                on_worker_connection(func), thread_sensitive=False, executor=_executor
+            )()
+            for func in funcs
+        )
+    )
@@ -0,0 +1,147 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+
+from .aggregates import rollup_stats_parts
+from .async_db import gather_queries
+from .cache import acached_dashboard
+from .clustering import aiter_cluster_collection, should_cluster
+from .db_router import reads_from_replica
+from .filters import filter_reports, parse_report_filters, parse_zoom
+from .geojson import FEATURE_FIELDS, aiter_feature_collection, reports_etag
+from .models import Community, PropertyReport, ViolationType
+from .views import (
+    SUPERUSER_TOP_VIOLATIONS,
+    _dashboard_chart_context,
+    _dashboard_filter_context,
+    _dashboard_period,
+    _report_list_context,
+    _report_list_export_formats,
+    _report_list_page,
+    _report_list_sort,
+    _superuser_context,
+)
+
+
+async def _render(request, template_name, context):
+    """render() on a worker thread.
+
+    Templates and context processors may still query lazily (``user``,
+    related objects), which the async ORM guard forbids on the event loop.
+    The user already loaded by ``login_required`` is reused for them.
+    """
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, template_name, context)
+
+
+# -----------------------------
+# Report list
+# -----------------------------
+@login_required
+@reads_from_replica
+async def report_list(request):
+    filters = parse_report_filters(request.GET)
+    sort = _report_list_sort(request.GET, filters)
+    user = await request.auser()
+
+    page, violations, export_formats = await gather_queries(
+        lambda: _report_list_page(request.GET, filters, sort),
+        lambda: list(ViolationType.objects.only("id", "name")),
+        lambda: _report_list_export_formats(user),
+    )
+
+    context = _report_list_context(
+        request.GET, filters, sort, page, violations, export_formats
+    )
+    return await _render(request, "reporting/report_list.html", context)
+
+
+# -----------------------------
+# Report detail
+# -----------------------------
+@login_required
+async def report_detail(request, report_id):
+    report = await aget_object_or_404(
+        PropertyReport.objects.select_related("violation"), report_id=report_id
+    )
+    return await _render(request, "reporting/report_detail.html", {"report": report})
+
+
+# -----------------------------
+# Dashboards
+# -----------------------------
+@login_required
+async def dashboard(request):
+    current_year, selected_year, selected_month = _dashboard_period(request)
+
+    async def compute():
+        summary, violations = await gather_queries(
+            *rollup_stats_parts(
+                year=selected_year,
+                month=selected_month,
+                monthly=not selected_month,
+            )
+        )
+        summary.violations = violations
+        return _dashboard_chart_context(summary, selected_year, selected_month)
+
+    context = dict(
+        await acached_dashboard("manager", selected_year, selected_month, compute)
+    )
+    context.update(
+        _dashboard_filter_context(current_year, selected_year, selected_month)
+    )
+    return await _render(request, "reporting/summary-dashboard.html", context)
+
+
+@login_required
+async def superuser_dashboard(request):
+    if not (await request.auser()).is_superuser:
+        return redirect("async_dashboard")
+
+    async def compute():
+        summary, violations, users, communities, violation_types = await gather_queries(
+            *rollup_stats_parts(monthly=False, top_violations=SUPERUSER_TOP_VIOLATIONS),
+            User.objects.count,
+            Community.objects.count,
+            ViolationType.objects.count,
+        )
+        summary.violations = violations
+        return _superuser_context(summary, users, communities, violation_types)
+
+    context = await acached_dashboard("superuser", None, None, compute)
+    return await _render(request, "reporting/superuser_dashboard.html", context)
+
+
+# -----------------------------
+# Map data
+# -----------------------------
+@login_required
+async def reports_geojson(request):
+    """Streamed GeoJSON, read with ``aiterator()`` between event-loop turns."""
+    filters = parse_report_filters(request.GET)
+    zoom = parse_zoom(request.GET.get("zoom"))
+    clustered = should_cluster(zoom)
+
+    etag = await sync_to_async(reports_etag)(
+        {**filters, "zoom": zoom if clustered else None}
+    )
+    if etag in request.headers.get("If-None-Match", ""):
+        return HttpResponseNotModified(headers={"ETag": etag})
+
+    rows = filter_reports(
+        PropertyReport.objects.with_location().order_by(),
+        filters,
+    )
+
+    if clustered:
+        content = aiter_cluster_collection(rows, zoom)
+    else:
+        content = aiter_feature_collection(rows.values(*FEATURE_FIELDS))
+
+    response = StreamingHttpResponse(content, content_type="application/geo+json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
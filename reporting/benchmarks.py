@@ -0,0 +1,624 @@
+import asyncio
+import copy
+import itertools
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from io import BytesIO, StringIO
+
+import numpy as np
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import close_old_connections, connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from PIL import Image
+from shapely.geometry import shape
+
+from accounts.importing import sync_stands
+from accounts.models import Resident
+from . import async_db, cache, db_router
+from .models import PropertyReport, ViolationType
+from .rollups import rebuild_daily_stats
+from .synthetic import (
+    ESTATE_BOUNDARY,
+    ReportGenerator,
+    date_distribution,
+    sample_points,
+)
+
+BENCH_PREFIX = "bench-"
+BENCH_STANDS = 1000
+
+# Untimed requests per interface before a load run
+WARMUP_REQUESTS = 10
+
+
+@dataclass
+class Measurement:
+    name: str
+    size: int
+    seconds: float
+    queries: int
+    peak_kb: int
+
+
+# ==============================
+# ENVIRONMENT
+# ==============================
+def isolated_caches(workdir):
+    """settings.CACHES with file-based caches moved into ``workdir``."""
+    caches = {}
+    for alias, config in settings.CACHES.items():
+        config = dict(config)
+        if config["BACKEND"].endswith("FileBasedCache"):
+            config["LOCATION"] = os.path.join(workdir, "cache", alias)
+        caches[alias] = config
+    return caches
+
+
+@contextmanager
+def mirrored_replicas():
+    """Point the TEST MIRROR aliases (read replicas) at the test database.
+
+    Connection settings are updated in place, so connections opened later by
+    worker threads use the test database too.
+    """
+    mirrors = [
+        alias
+        for alias in connections
+        if connections[alias].settings_dict["TEST"].get("MIRROR") == connection.alias
+    ]
+    keys = ("NAME", "HOST", "PORT", "USER", "PASSWORD")
+    saved = {}
+    for alias in mirrors:
+        connections[alias].close()
+        settings_dict = connections[alias].settings_dict
+        saved[alias] = {key: settings_dict[key] for key in keys}
+        settings_dict.update({key: connection.settings_dict[key] for key in keys})
+    db_router.reset_health()
+    try:
+        yield
+    finally:
+        for alias in mirrors:
+            connections[alias].close()
+            connections[alias].settings_dict.update(saved[alias])
+        db_router.reset_health()
+
+
+@contextmanager
+def benchmark_environment(keepdb=False):
+    """A test database, with media and file caches in a temp dir (yielded)."""
+    old_name = connection.settings_dict["NAME"]
+    setup_test_environment()
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False
+    )
+    try:
+        with mirrored_replicas(), tempfile.TemporaryDirectory(
+            prefix=BENCH_PREFIX
+        ) as workdir:
+            with override_settings(
+                MEDIA_ROOT=os.path.join(workdir, "media"),
+                CACHES=isolated_caches(workdir),
+            ):
+                yield workdir
+    finally:
+        # Persistent connections of worker threads would block the DROP
+        async_db.close_worker_connections()
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+# ==============================
+# MEASURING
+# ==============================
+def measure(name, size, run, setup=None, repeat=3):
+    """Median wall time, max query count and peak Python memory of ``run``.
+
+    ``setup`` runs untimed before every call. Memory is traced in one extra
+    call, since tracemalloc slows the code it watches.
+    """
+    timings, queries = [], []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        queries.append(len(ctx.captured_queries))
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(
+        name=name,
+        size=size,
+        seconds=round(statistics.median(timings), 4),
+        queries=max(queries),
+        peak_kb=peak // 1024,
+    )
+
+
+def _get(client, url, **params):
+    def run():
+        response = client.get(url, params)
+        assert response.status_code == 200, f"{url}: HTTP {response.status_code}"
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    return run
+
+
+# ==============================
+# FIXTURES
+# ==============================
+def bench_user():
+    user, created = User.objects.get_or_create(
+        username=f"{BENCH_PREFIX}admin",
+        defaults={"is_staff": True, "is_superuser": True},
+    )
+    if created:
+        user.set_password("bench")
+        user.save()
+    return user
+
+
+def seed_violations():
+    if not ViolationType.objects.filter(is_active=True).exists():
+        for category, name in ViolationType.CATEGORY_CHOICES:
+            ViolationType.objects.create(
+                name=name, category=category, description=name, fine_amount=50
+            )
+    return list(ViolationType.objects.filter(is_active=True))
+
+
+def seed_stands(count=BENCH_STANDS, seed=0):
+    points = zip(
+        *sample_points(shape(ESTATE_BOUNDARY), count, np.random.default_rng(seed))
+    )
+    features = [
+        {
+            "properties": {"stand_numb": f"B{i:05d}", "street": "Bench Street"},
+            "geometry": {"coordinates": [lon, lat]},
+        }
+        for i, (lon, lat) in enumerate(points)
+    ]
+    sync_stands(features)
+    return features
+
+
+def seed_reports(size, user, violations, seed=0):
+    """Top the report table up to ``size`` rows with the dummy generator."""
+    missing = size - PropertyReport.objects.count()
+    if missing > 0:
+        days, weights = date_distribution(
+            "2020-01-01", time.strftime("%Y-%m-%d"), seasonal=0.3
+        )
+        generator = ReportGenerator(
+            shape(ESTATE_BOUNDARY), violations, user, days, weights, seed=seed + size
+        )
+        generator.generate(missing)
+        rebuild_daily_stats()
+    cache.bump_all()
+
+
+def jpeg_upload(size=(2000, 1500)):
+    buffer = BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+# ==============================
+# SCENARIOS
+# ==============================
+def run_suite(size, repeat=3, workdir=None):
+    """Seed ``size`` reports and measure every hot path. Returns Measurements.
+
+    Import files are written to ``workdir``, or to a temporary directory
+    removed afterwards.
+    """
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix=BENCH_PREFIX) as workdir:
+            return run_suite(size, repeat, workdir)
+
+    user = bench_user()
+    violations = seed_violations()
+    features = seed_stands()
+    seed_reports(size, user, violations)
+
+    client = Client()
+    client.force_login(user)
+    results = []
+
+    def bench(name, run, setup=None):
+        results.append(measure(name, size, run, setup=setup, repeat=repeat))
+
+    bench("report_list", _get(client, reverse("report_list")))
+    bench(
+        "report_list_filtered",
+        _get(client, reverse("report_list"), status="OPEN", sort="oldest"),
+    )
+    bench("dashboard", _get(client, reverse("dashboard")), setup=cache.bump_all)
+    bench("dashboard_cached", _get(client, reverse("dashboard")))
+    bench(
+        "superuser_dashboard",
+        _get(client, reverse("superuser_dashboard")),
+        setup=cache.bump_all,
+    )
+    bench("reports_map", _get(client, reverse("reports_map")))
+    bench(
+        "reports_geojson",
+        _get(client, reverse("reports_geojson"), zoom=18),
+        setup=cache.bump_all,
+    )
+
+    image = jpeg_upload()
+
+    def create_report():
+        response = client.post(
+            reverse("create_report"),
+            {
+                "house_number": "H-1",
+                "violation": violations[0].pk,
+                "description": "Benchmark report",
+                "latitude": features[0]["geometry"]["coordinates"][1],
+                "longitude": features[0]["geometry"]["coordinates"][0],
+                "image": SimpleUploadedFile("bench.jpg", image, "image/jpeg"),
+            },
+        )
+        assert response.status_code == 302, f"create_report: {response.status_code}"
+
+    bench("create_report", create_report)
+
+    # Import commands, against files written to workdir
+    residents_file = os.path.join(workdir, "residents.json")
+    with open(residents_file, "w") as f:
+        json.dump(
+            {
+                "residents": [
+                    {
+                        "user": {
+                            "username": f"{BENCH_PREFIX}resident{i}",
+                            "email": f"resident{i}@example.com",
+                            "password": "temporary123",
+                        },
+                        "stand_numb": feature["properties"]["stand_numb"],
+                        "phone": f"+26377{i:07d}",
+                    }
+                    for i, feature in enumerate(features)
+                ]
+            },
+            f,
+        )
+
+    def clear_residents():
+        Resident.objects.filter(user__username__startswith=BENCH_PREFIX).delete()
+        User.objects.filter(username__startswith=f"{BENCH_PREFIX}resident").delete()
+
+    bench(
+        "import_residents",
+        lambda: call_command(
+            "import_residents", file=residents_file, stdout=StringIO()
+        ),
+        setup=clear_residents,
+    )
+
+    stands_file = os.path.join(workdir, "stands.geojson")
+
+    def write_stands():
+        # Every run moves a tenth of the stands so the diff has work to do
+        rng = np.random.default_rng()
+        changed = rng.random(len(features)) < 0.1
+        with open(stands_file, "w") as f:
+            json.dump(
+                {
+                    "features": [
+                        {
+                            "properties": feature["properties"],
+                            "geometry": {
+                                "coordinates": [
+                                    feature["geometry"]["coordinates"][0]
+                                    + (rng.normal(0, 1e-5) if moved else 0),
+                                    feature["geometry"]["coordinates"][1],
+                                ]
+                            },
+                        }
+                        for feature, moved in zip(features, changed)
+                    ]
+                },
+                f,
+            )
+
+    bench(
+        "import_stands",
+        lambda: call_command("import_stands", stands_file, stdout=StringIO()),
+        setup=write_stands,
+    )
+
+    return results
+
+
+# ==============================
+# CONCURRENT LOAD (WSGI vs ASGI)
+# ==============================
+@dataclass
+class LoadResult:
+    interface: str
+    concurrency: int
+    requests: int
+    errors: int
+    seconds: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+    @property
+    def throughput(self):
+        return self.requests / self.seconds if self.seconds else 0.0
+
+
+def _load_result(interface, concurrency, seconds, samples):
+    latencies = sorted(ms for ms, _ in samples)
+    return LoadResult(
+        interface=interface,
+        concurrency=concurrency,
+        requests=len(samples),
+        errors=sum(1 for _, ok in samples if not ok),
+        seconds=round(seconds, 3),
+        p50_ms=round(latencies[len(latencies) // 2], 1),
+        p95_ms=round(latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)], 1),
+        max_ms=round(latencies[-1], 1),
+    )
+
+
+def load_plan(requests, report_id, upload, async_views=False, upload_every=5):
+    """``requests`` (method, url, data) tuples cycling through the read pages.
+
+    Every ``upload_every``-th request POSTs ``upload`` to create_report, which
+    also invalidates the cached dashboards the way patrol traffic does.
+    ``async_views`` uses the async_* routes for the pages that have one.
+    """
+    prefix = "async_" if async_views else ""
+    report_list = reverse(f"{prefix}report_list")
+    geojson = reverse(f"{prefix}reports_geojson")
+    pages = [
+        ("GET", report_list, {}),
+        ("GET", report_list, {"status": "OPEN", "sort": "oldest"}),
+        ("GET", reverse(f"{prefix}report_detail", args=[report_id]), {}),
+        ("GET", reverse(f"{prefix}dashboard"), {}),
+        ("GET", reverse(f"{prefix}superuser_dashboard"), {}),
+        ("GET", geojson, {"zoom": 14}),
+        ("GET", geojson, {"zoom": 18}),
+    ]
+    reads = itertools.cycle(pages)
+    return [
+        (
+            ("POST", reverse("create_report"), upload)
+            if upload_every and i % upload_every == upload_every - 1
+            else next(reads)
+        )
+        for i in range(requests)
+    ]
+
+
+def _post_data(data):
+    """Fresh upload objects per request; a file can only be read once."""
+    data = dict(data)
+    if "image" in data:
+        data["image"] = SimpleUploadedFile("bench.jpg", data["image"], "image/jpeg")
+    return data
+
+
+def _ok(method, response):
+    return response.status_code == (302 if method == "POST" else 200)
+
+
+def run_wsgi_load(plan, cookies, concurrency):
+    """Replay ``plan`` through the WSGI handler from ``concurrency`` threads.
+
+    Mirrors a threaded WSGI server: each thread blocks on its request's
+    queries and holds its own connection.
+    """
+    local = threading.local()
+
+    def send(item):
+        method, url, data = item
+        if not hasattr(local, "client"):
+            local.client = Client()
+            local.client.cookies = copy.deepcopy(cookies)
+        start = time.perf_counter()
+        if method == "POST":
+            response = local.client.post(url, _post_data(data))
+        else:
+            response = local.client.get(url, data)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        response.close()
+        # The test client skips the request_finished connection cleanup
+        close_old_connections()
+        return (time.perf_counter() - start) * 1000, _ok(method, response)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(send, plan))
+    seconds = time.perf_counter() - start
+    return _load_result("wsgi", concurrency, seconds, samples)
+
+
+def run_asgi_load(plan, cookies, concurrency, interface="asgi"):
+    """Replay ``plan`` through the ASGI handler on one event loop.
+
+    ``concurrency`` client tasks keep that many requests in flight, the way
+    a single ASGI worker process would under load.
+    """
+
+    async def worker(queue, samples):
+        client = AsyncClient()
+        client.cookies = copy.deepcopy(cookies)
+        while True:
+            try:
+                method, url, data = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            # As in ASGIHandler: sync code of one request shares one thread
+            async with ThreadSensitiveContext():
+                if method == "POST":
+                    response = await client.post(url, _post_data(data))
+                else:
+                    response = await client.get(url, data)
+                if response.streaming:
+                    if response.is_async:
+                        async for _ in response.streaming_content:
+                            pass
+                    else:
+                        for _ in response.streaming_content:
+                            pass
+                # The test client skips the request_finished connection cleanup
+                await sync_to_async(close_old_connections)()
+            samples.append(
+                ((time.perf_counter() - start) * 1000, _ok(method, response))
+            )
+
+    async def main():
+        queue = asyncio.Queue()
+        for item in plan:
+            queue.put_nowait(item)
+        samples = []
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(queue, samples) for _ in range(concurrency)))
+        return time.perf_counter() - start, samples
+
+    seconds, samples = asyncio.run(main())
+    return _load_result(interface, concurrency, seconds, samples)
+
+
+def run_asgi_sequential_load(plan, cookies, concurrency):
+    """ASGI with gather_queries running its queries one after another."""
+    concurrent = async_db.ASYNC_DB_CONCURRENT
+    async_db.ASYNC_DB_CONCURRENT = False
+    try:
+        return run_asgi_load(plan, cookies, concurrency, interface="asgi-seq")
+    finally:
+        async_db.ASYNC_DB_CONCURRENT = concurrent
+
+
+def run_load_suite(size, concurrencies, requests, upload_every=5):
+    """Seed ``size`` reports, then run the same mix through WSGI and ASGI.
+
+    ASGI runs twice: with gathered queries concurrent, and sequential
+    ("asgi-seq") to show whether the extra connections pay off. Returns
+    LoadResults in that order for each concurrency level.
+    """
+    user = bench_user()
+    violations = seed_violations()
+    features = seed_stands()
+    seed_reports(size, user, violations)
+
+    client = Client()
+    client.force_login(user)
+    report_id = PropertyReport.objects.values_list("report_id", flat=True).first()
+    lon, lat = features[0]["geometry"]["coordinates"]
+    upload = {
+        "house_number": "H-1",
+        "violation": violations[0].pk,
+        "description": "Benchmark upload",
+        "latitude": lat,
+        "longitude": lon,
+        "image": jpeg_upload((640, 480)),
+    }
+
+    plans = {
+        interface: load_plan(
+            requests,
+            report_id,
+            upload,
+            async_views=interface != "wsgi",
+            upload_every=upload_every,
+        )
+        for interface in ("wsgi", "asgi", "asgi-seq")
+    }
+    runners = {
+        "wsgi": run_wsgi_load,
+        "asgi": run_asgi_load,
+        "asgi-seq": run_asgi_sequential_load,
+    }
+
+    # A short sequential pass warms templates and URL resolving
+    for interface, plan in plans.items():
+        runners[interface](plan[:WARMUP_REQUESTS], client.cookies, 1)
+
+    results = []
+    for concurrency in concurrencies:
+        for interface, plan in plans.items():
+            cache.bump_all()
+            results.append(runners[interface](plan, client.cookies, concurrency))
+    return results
+
+
+# ==============================
+# BASELINE
+# ==============================
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, baseline=None):
+    """Write ``results`` into the baseline, keeping sizes not re-measured."""
+    baseline = dict(baseline or {})
+    for m in results:
+        baseline.setdefault(str(m.size), {})[m.name] = {
+            key: value
+            for key, value in asdict(m).items()
+            if key not in ("name", "size")
+        }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=0.25):
+    """Regressions as (measurement, metric, baseline value) tuples.
+
+    Time and memory may grow by ``threshold`` (a fraction); the query count
+    is deterministic and must not grow at all.
+    """
+    regressions = []
+    for m in results:
+        base = baseline.get(str(m.size), {}).get(m.name)
+        if not base:
+            continue
+        for metric in ("seconds", "peak_kb"):
+            if getattr(m, metric) > base[metric] * (1 + threshold):
+                regressions.append((m, metric, base[metric]))
+        if m.queries > base["queries"]:
+            regressions.append((m, "queries", base["queries"]))
+    return regressions
@@ -0,0 +1,131 @@
+import os
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import PropertyReport, ReportImage, StoredBlob
+from .storage import content_addressed_storage, is_blob_name
+
+# Model fields whose files live in the content-addressed storage
+REFERENCING_FIELDS = [
+    (PropertyReport, "image"),
+    (ReportImage, "image"),
+]
+
+
+# ==============================
+# REFERENCE COUNTING
+# ==============================
+def _adjust(name, delta):
+    if not is_blob_name(name):
+        return
+    blobs = StoredBlob.objects.filter(name=name)
+    with transaction.atomic():
+        if blobs.update(refcount=F("refcount") + delta):
+            return
+        try:
+            with transaction.atomic():
+                StoredBlob.objects.create(name=name, refcount=delta)
+        except IntegrityError:
+            blobs.update(refcount=F("refcount") + delta)
+
+
+def add_reference(name):
+    _adjust(name, 1)
+
+
+def release_reference(name):
+    _adjust(name, -1)
+
+
+def replace_reference(old_name, new_name):
+    if old_name == new_name:
+        return
+    with transaction.atomic():
+        add_reference(new_name)
+        release_reference(old_name)
+
+
+def recount_references():
+    """Recompute every refcount from the referencing model rows."""
+    counts = {}
+    for model, field in REFERENCING_FIELDS:
+        rows = (
+            model.objects.order_by()
+            .exclude(**{field: ""})
+            .exclude(**{f"{field}__isnull": True})
+            .values(field)
+            .annotate(n=Count("pk"))
+        )
+        for row in rows.iterator():
+            if is_blob_name(row[field]):
+                counts[row[field]] = counts.get(row[field], 0) + row["n"]
+
+    with transaction.atomic():
+        StoredBlob.objects.exclude(name__in=counts).update(refcount=0)
+        for name, refcount in counts.items():
+            StoredBlob.objects.update_or_create(
+                name=name, defaults={"refcount": refcount}
+            )
+    return len(counts)
+
+
+# ==============================
+# GARBAGE COLLECTION
+# ==============================
+def iter_blob_files(storage=content_addressed_storage):
+    """Yield (name, mtime) for every content-addressed file on disk."""
+    root = storage.path("")
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != ".tmp"]
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            if is_blob_name(name):
+                yield name, os.path.getmtime(path)
+
+
+def _delete_unreferenced(name, cutoff, storage):
+    """Delete one blob if it is still unreferenced and old; True if deleted.
+
+    Runs under a lock on its StoredBlob row, so a reference added meanwhile
+    either is seen here or waits until the row is gone.
+    """
+    with transaction.atomic():
+        blob = StoredBlob.objects.select_for_update().filter(name=name).first()
+        if blob is not None and blob.refcount > 0:
+            return False
+        # A duplicate upload since the scan refreshes the mtime
+        try:
+            if os.path.getmtime(storage.path(name)) > cutoff:
+                return False
+        except FileNotFoundError:
+            return False
+        if blob is not None:
+            deleted, _ = StoredBlob.objects.filter(name=name, refcount__lte=0).delete()
+            if not deleted:
+                return False
+        # No row at all: written but never referenced
+        storage.delete(name)
+    return True
+
+
+def collect_garbage(grace_seconds=86400, dry_run=False):
+    """Delete blobs no row references any more. Returns the removed names.
+
+    Files younger than ``grace_seconds`` are kept: an upload is written to
+    storage before the model row that references it is committed.
+    """
+    referenced = set(
+        StoredBlob.objects.filter(refcount__gt=0).values_list("name", flat=True)
+    )
+    cutoff = time.time() - grace_seconds
+
+    removed = []
+    for name, mtime in iter_blob_files():
+        if name in referenced or mtime > cutoff:
+            continue
+        if dry_run or _delete_unreferenced(name, cutoff, content_addressed_storage):
+            removed.append(name)
+    return removed
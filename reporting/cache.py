@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+DASHBOARD_CACHE_ALIAS = getattr(settings, "DASHBOARD_CACHE_ALIAS", "default")
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300)
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+# Bucket (0, 0) covers all time, (year, 0) a whole year
+ALL_TIME = 0
+
+
+def dashboard_cache():
+    return caches[DASHBOARD_CACHE_ALIAS]
+
+
+# ==============================
+# VERSIONS
+# ==============================
+def _version_key(year, month):
+    return f"dashboard:version:{year}:{month}"
+
+
+GENERATION_KEY = "dashboard:generation"
+
+
+def _initial_version():
+    # Time-based so an evicted version never comes back as an old number
+    return time.time_ns()
+
+
+def get_version(key):
+    cache = dashboard_cache()
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump(key):
+    # FileBasedCache.incr is get-then-set; concurrent bumps may collapse into
+    # one, but the version still moves past every value read before them
+    cache = dashboard_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def bump_dates(dates):
+    """Invalidate the month, year and all-time buckets for the given dates."""
+    keys = {_version_key(ALL_TIME, 0)}
+    for day in dates:
+        if day is None:
+            continue
+        keys.add(_version_key(day.year, 0))
+        keys.add(_version_key(day.year, day.month))
+    for key in keys:
+        bump(key)
+
+
+def bump_all():
+    """Invalidate every bucket (e.g. a violation was renamed)."""
+    bump(GENERATION_KEY)
+
+
+# ==============================
+# LOOKUP
+# ==============================
+def dashboard_key(role, year=None, month=None):
+    year = year or ALL_TIME
+    month = month or 0
+    return "dashboard:{}:{}:{}:g{}:v{}".format(
+        role,
+        year,
+        month,
+        get_version(GENERATION_KEY),
+        get_version(_version_key(year, month)),
+    )
+
+
+def get_or_compute(key, compute, timeout=None):
+    """Return the cached value for ``key`` or compute it once.
+
+    Concurrent misses wait for the request holding the lock instead of
+    recomputing the same value in parallel. The lock is best-effort: it
+    relies on ``add`` being atomic, and FileBasedCache (the default for
+    the dashboard alias) implements it as check-then-write, so two requests
+    may occasionally both compute. Use Redis or Memcached for
+    DASHBOARD_CACHE_BACKEND where that matters.
+    """
+    cache = dashboard_cache()
+    if timeout is None:
+        timeout = DASHBOARD_CACHE_TIMEOUT
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            break
+
+    # Lock holder failed or timed out
+    return compute()
+
+
+def cached_dashboard(role, year, month, compute):
+    return get_or_compute(dashboard_key(role, year, month), compute)
+
+
+async def aget_or_compute(key, acompute, timeout=None):
+    """``get_or_compute`` for async views; ``acompute`` is awaited.
+
+    Waiting for another request's lock sleeps on the event loop instead of
+    blocking a thread.
+    """
+    cache = dashboard_cache()
+    if timeout is None:
+        timeout = DASHBOARD_CACHE_TIMEOUT
+
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = await acompute()
+            await cache.aset(key, value, timeout)
+        finally:
+            await cache.adelete(lock_key)
+        return value
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+        if await cache.aget(lock_key) is None:
+            break
+
+    # Lock holder failed or timed out
+    return await acompute()
+
+
+async def acached_dashboard(role, year, month, acompute):
+    key = await sync_to_async(dashboard_key)(role, year, month)
+    return await aget_or_compute(key, acompute)
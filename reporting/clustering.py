@@ -0,0 +1,100 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, FloatField, Sum
+from django.db.models.functions import Cast, Floor
+
+# Zoom level from which individual report points are returned
+CLUSTER_MAX_ZOOM = getattr(settings, "REPORT_CLUSTER_MAX_ZOOM", 18)
+
+# Approximate on-screen size of one grid cell
+CLUSTER_CELL_PIXELS = getattr(settings, "REPORT_CLUSTER_CELL_PIXELS", 64)
+
+
+def should_cluster(zoom):
+    return zoom is not None and zoom < CLUSTER_MAX_ZOOM
+
+
+def cell_size(zoom):
+    """Grid cell size in degrees for a web-mercator zoom level."""
+    return 360.0 / (2**zoom) * (CLUSTER_CELL_PIXELS / 256.0)
+
+
+def cluster_cells(rows, zoom):
+    """Aggregate reports into grid cells with one GROUP BY query.
+
+    Returns one dict per cell with the report count, the centroid and the
+    most frequent violation. The number of cells is bounded by the viewport,
+    not by how many reports it contains.
+    """
+    size = cell_size(zoom)
+
+    grouped = (
+        rows.order_by()
+        .annotate(
+            cell_x=Floor(Cast("longitude", FloatField()) / size),
+            cell_y=Floor(Cast("latitude", FloatField()) / size),
+        )
+        .values("cell_x", "cell_y", "violation__name")
+        .annotate(
+            count=Count("id"),
+            lon_sum=Sum(Cast("longitude", FloatField())),
+            lat_sum=Sum(Cast("latitude", FloatField())),
+        )
+    )
+
+    cells = {}
+    for entry in grouped:
+        key = (entry["cell_x"], entry["cell_y"])
+        cell = cells.setdefault(
+            key,
+            {"count": 0, "lon_sum": 0.0, "lat_sum": 0.0, "violation": None, "top": 0},
+        )
+        cell["count"] += entry["count"]
+        cell["lon_sum"] += entry["lon_sum"]
+        cell["lat_sum"] += entry["lat_sum"]
+        if entry["count"] > cell["top"]:
+            cell["top"] = entry["count"]
+            cell["violation"] = entry["violation__name"]
+
+    return [
+        {
+            "count": cell["count"],
+            "longitude": cell["lon_sum"] / cell["count"],
+            "latitude": cell["lat_sum"] / cell["count"],
+            "violation": cell["violation"],
+        }
+        for cell in cells.values()
+    ]
+
+
+def cluster_feature(cell):
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [round(cell["longitude"], 6), round(cell["latitude"], 6)],
+        },
+        "properties": {
+            "cluster": True,
+            "count": cell["count"],
+            "violation": cell["violation"],
+        },
+    }
+
+
+def _cluster_collection(cells):
+    features = [cluster_feature(cell) for cell in cells]
+    return json.dumps(
+        {"type": "FeatureCollection", "features": features}, separators=(",", ":")
+    )
+
+
+def iter_cluster_collection(rows, zoom):
+    yield _cluster_collection(cluster_cells(rows, zoom))
+
+
+async def aiter_cluster_collection(rows, zoom):
+    cells = await sync_to_async(cluster_cells)(rows, zoom)
+    yield _cluster_collection(cells)
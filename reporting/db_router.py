@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+# A replica further behind than this is skipped until it catches up
+MAX_LAG_SECONDS = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 30)
+
+# How long a replica's health is trusted, per process
+CHECK_INTERVAL = getattr(settings, "REPLICA_CHECK_INTERVAL", 10)
+
+# After a write, the client reads from the primary for this long, so it
+# sees its own changes even when the replicas are behind
+PIN_SECONDS = getattr(settings, "REPLICA_PIN_SECONDS", 30)
+PIN_COOKIE = "db_primary"
+
+# Apps whose reads always go to the primary
+PRIMARY_ONLY_APPS = {"sessions"}
+
+# Seconds the replica is behind; 0 when it has replayed everything it has
+# received (an idle primary would otherwise look like growing lag). NULL
+# when it isn't streaming: a replica cut off from the primary replays what
+# it has and then looks current forever
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+def replica_aliases():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+# ==============================
+# REQUEST STATE
+# ==============================
+@dataclass
+class RoutingState:
+    """Routing for one request (or ``replica_reads`` block).
+
+    Shared by reference with sync_to_async worker threads, so a write on any
+    of them pins the rest of the request.
+    """
+
+    use_replica: bool = False
+    pinned: bool = False
+    wrote: bool = False
+
+
+current = ContextVar("db_routing", default=None)
+
+
+def reads_from_replica(view):
+    """Let the view's reads go to a replica unless the request is pinned.
+
+    Needs ReplicaPinningMiddleware; the user lookup done by login_required
+    (applied outside this decorator) still reads from the primary.
+
+    Not for views whose output is cached or ETagged under versions bumped
+    on commit (dashboards, GeoJSON, tiles): a lagging replica would store
+    old data under the new version until the next change.
+    """
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            _allow_replica()
+            return await view(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        _allow_replica()
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _allow_replica():
+    state = current.get()
+    if state is not None:
+        state.use_replica = True
+
+
+@contextmanager
+def replica_reads():
+    """Send reads in the block to a replica, e.g. in management commands."""
+    token = current.set(RoutingState(use_replica=True))
+    try:
+        yield
+    finally:
+        current.reset(token)
+
+
+# ==============================
+# HEALTH
+# ==============================
+_health = {}  # alias -> (checked at, lag in seconds or None if down)
+_health_lock = threading.Lock()
+
+# Checks requested from the event loop, where no sync DB work may happen
+_background_checks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replica")
+
+
+def _on_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind the primary, or None if it is down or cut off."""
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+        # Driver cursor: primary_fallback would answer from the primary and
+        # make a dead replica look current
+        with connection.wrap_database_errors, connection.connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        connection.close()
+        return None
+    return None if lag is None else float(lag)
+
+
+def _record(alias, lag):
+    with _health_lock:
+        _health[alias] = (time.monotonic(), lag)
+    if lag is None:
+        logger.warning(
+            "Replica %s is unreachable or not streaming; reading from primary",
+            alias,
+        )
+    elif lag > MAX_LAG_SECONDS:
+        logger.warning("Replica %s is %.1fs behind; reading from primary", alias, lag)
+
+
+def _check(alias):
+    _record(alias, replica_lag(alias))
+
+
+def _check_in_background(alias):
+    try:
+        _check(alias)
+    finally:
+        connections[alias].close()
+
+
+def mark_down(alias):
+    """Skip ``alias`` until its next check, e.g. after a failed query."""
+    _record(alias, None)
+
+
+def healthy_replicas():
+    """Replicas that answered their last check within MAX_LAG_SECONDS.
+
+    Stale checks run inline on sync threads. On the event loop they run on
+    a background thread and the last known result is used meanwhile, an
+    unchecked replica counting as unhealthy.
+    """
+    on_loop = _on_event_loop()
+    now = time.monotonic()
+    healthy = []
+    for alias in replica_aliases():
+        with _health_lock:
+            checked_at, lag = _health.get(alias, (None, None))
+            stale = checked_at is None or now - checked_at > CHECK_INTERVAL
+            if stale:
+                # Claim the check so concurrent requests use the old result
+                _health[alias] = (now, lag)
+        if stale:
+            if on_loop:
+                _background_checks.submit(_check_in_background, alias)
+            else:
+                _check(alias)
+                lag = _health[alias][1]
+        if lag is not None and lag <= MAX_LAG_SECONDS:
+            healthy.append(alias)
+    return healthy
+
+
+def reset_health():
+    with _health_lock:
+        _health.clear()
+
+
+def _connected(alias):
+    """Connect ``alias`` now, so a replica that just went down is skipped."""
+    try:
+        connections[alias].ensure_connection()
+    except OperationalError:
+        mark_down(alias)
+        return False
+    return True
+
+
+# ==============================
+# FALLBACK
+# ==============================
+def primary_fallback(execute, sql, params, many, context):
+    """Execute wrapper on replica connections: retry failed reads on the primary.
+
+    The replica is marked down and the caller's cursor is switched to one
+    on the primary, so its fetches read the primary's result.
+    """
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError:
+        connection = context["connection"]
+        if connection.in_atomic_block:
+            raise
+        mark_down(connection.alias)
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        with primary.wrap_database_errors:
+            cursor = primary.connection.cursor()
+            if many:
+                cursor.executemany(sql, params)
+            elif params is None:
+                cursor.execute(sql)
+            else:
+                cursor.execute(sql, params)
+        context["cursor"].cursor = cursor
+
+
+def install(connection, **kwargs):
+    """connection_created receiver: add the fallback to replica connections."""
+    if (
+        connection.alias in replica_aliases()
+        and primary_fallback not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(primary_fallback)
+
+
+# ==============================
+# ROUTER
+# ==============================
+class ReplicaRouter:
+    """Opted-in reads to a healthy replica; everything else to the primary.
+
+    Returning None leaves Django's default, which is the primary, or the
+    database a related instance was loaded from.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current.get()
+        if (
+            state is None
+            or not state.use_replica
+            or state.pinned
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+        ):
+            return None
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        replicas = healthy_replicas()
+        random.shuffle(replicas)
+        if _on_event_loop():
+            # Connecting is sync work; primary_fallback covers a failure
+            return replicas[0] if replicas else None
+        for alias in replicas:
+            if _connected(alias):
+                return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = current.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,197 @@
+import csv
+import json
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from .filters import filter_reports, parse_report_filters
+from .models import PropertyReport
+
+try:
+    import xlsxwriter
+except ImportError:  # optional: only needed for .xlsx exports
+    xlsxwriter = None
+
+# (column header, values_list lookup)
+EXPORT_COLUMNS = [
+    ("report_id", "report_id"),
+    ("report_date", "report_date"),
+    ("created_at", "created_at"),
+    ("house_number", "house_number"),
+    ("stand", "stand__stand_numb"),
+    ("violation", "violation__name"),
+    ("category", "violation__category"),
+    ("status", "status"),
+    ("fine_amount", "fine_amount"),
+    ("fine_paid", "fine_paid"),
+    ("latitude", "latitude"),
+    ("longitude", "longitude"),
+    ("reported_by", "reported_by__username"),
+]
+
+CHUNK_SIZE = 2000
+
+# Profiles allowed to export, besides staff
+EXPORT_USER_TYPES = {"MANAGER", "ACCOUNTS"}
+
+FINE_PAID_VALUES = {
+    "1": True,
+    "true": True,
+    "yes": True,
+    "0": False,
+    "false": False,
+    "no": False,
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def available_formats():
+    return [fmt for fmt in CONTENT_TYPES if fmt != "xlsx" or xlsxwriter]
+
+
+def can_export(user):
+    if not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    profile = getattr(user, "profile", None)
+    return profile is not None and profile.user_type in EXPORT_USER_TYPES
+
+
+# ==============================
+# ROWS
+# ==============================
+def parse_export_filters(params):
+    """Dashboard filters plus ``fine_paid`` (yes/no)."""
+    filters = parse_report_filters(params)
+    fine_paid = (params.get("fine_paid") or "").lower()
+    filters["fine_paid"] = FINE_PAID_VALUES.get(fine_paid)
+    return filters
+
+
+def export_rows(filters, chunk_size=CHUNK_SIZE):
+    """Tuples in EXPORT_COLUMNS order, read through a server-side cursor."""
+    reports = filter_reports(PropertyReport.objects.order_by("id"), filters)
+    if filters.get("fine_paid") is not None:
+        reports = reports.filter(fine_paid=filters["fine_paid"])
+    return reports.values_list(*[lookup for _, lookup in EXPORT_COLUMNS]).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def export_filename(filters, fmt):
+    parts = ["reports"]
+    if filters.get("year"):
+        parts.append(str(filters["year"]))
+        if filters.get("month"):
+            parts.append(f"{filters['month']:02d}")
+    return f"{'-'.join(parts)}.{fmt}"
+
+
+# Text cells starting with these run as formulas in spreadsheet apps
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_cell(value):
+    """``_text``, with user-entered text that looks like a formula quoted.
+
+    Only strings: negative coordinates and fines must stay numbers.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return _text(value)
+
+
+# ==============================
+# FORMATS
+# ==============================
+class _Echo:
+    """File-like object whose write() just returns the line (for csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def iter_ndjson(rows):
+    """One GeoJSON Feature per line."""
+    headers = [header for header, _ in EXPORT_COLUMNS]
+    for row in rows:
+        properties = {
+            header: (
+                value
+                if value is None or isinstance(value, (bool, int))
+                else _text(value)
+            )
+            for header, value in zip(headers, row)
+        }
+        lat, lon = properties.pop("latitude"), properties.pop("longitude")
+        geometry = None
+        if lat is not None and lon is not None:
+            geometry = {"type": "Point", "coordinates": [float(lon), float(lat)]}
+        yield json.dumps(
+            {"type": "Feature", "geometry": geometry, "properties": properties}
+        ) + "\n"
+
+
+def write_xlsx(rows, path):
+    """Write an .xlsx file in xlsxwriter's constant-memory mode.
+
+    Rows are flushed to disk as they are written, so memory stays flat; the
+    workbook can only be streamed once it is closed.
+    """
+    if xlsxwriter is None:
+        raise RuntimeError("xlsxwriter is not installed (pip install xlsxwriter)")
+
+    workbook = xlsxwriter.Workbook(
+        path, {"constant_memory": True, "remove_timezone": True}
+    )
+    sheet = workbook.add_worksheet("Reports")
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd"})
+    datetime_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"})
+
+    sheet.write_row(0, 0, [header for header, _ in EXPORT_COLUMNS])
+    for r, row in enumerate(rows, start=1):
+        for c, value in enumerate(row):
+            if isinstance(value, datetime):
+                sheet.write_datetime(r, c, value, datetime_format)
+            elif isinstance(value, date):
+                sheet.write_datetime(r, c, value, date_format)
+            elif isinstance(value, Decimal):
+                sheet.write_number(r, c, float(value))
+            elif value is None or isinstance(value, (bool, int, float)):
+                sheet.write(r, c, value)
+            else:
+                sheet.write_string(r, c, str(value))
+    workbook.close()
+
+
+def xlsx_tempfile(rows):
+    """The workbook in an anonymous temp file, rewound for reading."""
+    tmp = tempfile.TemporaryFile(suffix=".xlsx")
+    try:
+        write_xlsx(rows, tmp)
+    except BaseException:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return tmp
@@ -0,0 +1,112 @@
+from datetime import date
+
+from .models import PropertyReport
+from .search import MAX_QUERY_LENGTH, match_reports
+
+STATUS_CODES = {code for code, _ in PropertyReport.STATUS_CHOICES}
+
+# Metres, for the "near" filter
+DEFAULT_RADIUS = 200
+MAX_RADIUS = 5000
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bbox_or_none(value):
+    """Parse ``minLon,minLat,maxLon,maxLat``."""
+    if not value:
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in value.split(","))
+    except ValueError:
+        return None
+    if min_lon > max_lon or min_lat > max_lat:
+        return None
+    return (min_lon, min_lat, max_lon, max_lat)
+
+
+def _point_or_none(value):
+    """Parse ``lon,lat``."""
+    if not value:
+        return None
+    try:
+        lon, lat = (float(v) for v in value.split(","))
+    except ValueError:
+        return None
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        return None
+    return (lon, lat)
+
+
+def parse_report_filters(params):
+    """Read the dashboard filters from a GET QueryDict; bad values are ignored."""
+    month = _int_or_none(params.get("month"))
+    status = params.get("status")
+
+    return {
+        "year": _int_or_none(params.get("year")),
+        "month": month if month and 1 <= month <= 12 else None,
+        "status": status if status in STATUS_CODES else None,
+        "violation": _int_or_none(params.get("violation")),
+        "bbox": _bbox_or_none(params.get("bbox")),
+        # "Reports near me": ?near=lon,lat&radius=metres
+        "near": _point_or_none(params.get("near")),
+        "radius": min(_int_or_none(params.get("radius")) or DEFAULT_RADIUS, MAX_RADIUS),
+        # Free-text search (see reporting.search)
+        "q": (params.get("q") or "").strip()[:MAX_QUERY_LENGTH],
+    }
+
+
+def parse_zoom(value):
+    """Map zoom level (0-22) or None."""
+    zoom = _int_or_none(value)
+    if zoom is None or not 0 <= zoom <= 22:
+        return None
+    return zoom
+
+
+def period_bounds(year, month=None):
+    """Half-open ``[start, end)`` dates of a year or one of its months.
+
+    Filtering on a range keeps ``report_date`` indexes usable, unlike
+    ``EXTRACT(MONTH ...)``.
+    """
+    if month:
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    return start, end
+
+
+def filter_period(rows, year=None, month=None, field="report_date"):
+    """Restrict ``rows`` to a year and/or month of ``field``."""
+    if year:
+        start, end = period_bounds(year, month)
+        return rows.filter(**{f"{field}__gte": start, f"{field}__lt": end})
+    if month:
+        # Same month across all years: no range covers it
+        return rows.filter(**{f"{field}__month": month})
+    return rows
+
+
+def filter_reports(reports, filters):
+    """Apply parsed filters to a PropertyReport queryset."""
+    reports = filter_period(reports, filters.get("year"), filters.get("month"))
+    if filters.get("status"):
+        reports = reports.filter(status=filters["status"])
+    if filters.get("violation"):
+        reports = reports.filter(violation_id=filters["violation"])
+    if filters.get("bbox"):
+        reports = reports.within_bbox(*filters["bbox"])
+    if filters.get("near"):
+        lon, lat = filters["near"]
+        reports = reports.within_radius(lon, lat, filters["radius"])
+    if filters.get("q"):
+        reports = match_reports(reports, filters["q"])
+    return reports
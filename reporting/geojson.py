@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+from . import cache
+
+FEATURE_FIELDS = (
+    "report_id",
+    "house_number",
+    "status",
+    "report_date",
+    "latitude",
+    "longitude",
+    "violation__name",
+)
+
+
+def reports_etag(filters):
+    """ETag derived from the cache version of the filtered period.
+
+    It changes whenever a report in that period (or a violation name) changes,
+    so it can be checked without touching PropertyReport.
+    """
+    year = filters.get("year")
+    month = filters.get("month") if year else None
+    version = cache.dashboard_key("geojson", year, month)
+    params = json.dumps(filters, sort_keys=True, default=str)
+    digest = hashlib.md5(f"{version}|{params}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def feature(row):
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [
+                round(float(row["longitude"]), 6),
+                round(float(row["latitude"]), 6),
+            ],
+        },
+        "properties": {
+            "id": str(row["report_id"]),
+            "house": row["house_number"],
+            "violation": row["violation__name"],
+            "status": row["status"],
+            "date": row["report_date"].isoformat() if row["report_date"] else None,
+        },
+    }
+
+
+def iter_feature_collection(rows, chunk_size=2000):
+    """Yield a FeatureCollection as text chunks, one feature at a time."""
+    yield '{"type":"FeatureCollection","features":['
+    separator = ""
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield separator + json.dumps(feature(row), separators=(",", ":"))
+        separator = ","
+    yield "]}"
+
+
+async def aiter_feature_collection(rows, chunk_size=2000):
+    """``iter_feature_collection`` for ASGI responses, via ``aiterator()``."""
+    yield '{"type":"FeatureCollection","features":['
+    separator = ""
+    async for row in rows.aiterator(chunk_size=chunk_size):
+        yield separator + json.dumps(feature(row), separators=(",", ":"))
+        separator = ","
+    yield "]}"
@@ -0,0 +1,195 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .blobs import replace_reference
+from .imaging import encode_jpeg
+from .models import ImageJob
+from .renditions import render_all, store_renditions
+from .storage import is_blob_name
+
+MAX_ATTEMPTS = 3
+
+# RUNNING jobs older than this belonged to a worker that died
+STALE_AFTER = timedelta(minutes=10)
+
+# Process uploads in the request (after commit) instead of queueing them;
+# handy for local development without a worker running
+IMAGE_JOBS_INLINE = getattr(settings, "IMAGE_JOBS_INLINE", False)
+
+
+# ==============================
+# STORAGE
+# ==============================
+def read_image(job):
+    field_file = getattr(job.target, job.field_name)
+    with field_file.open("rb") as f:
+        return f.read()
+
+
+def store_encoded(job, data):
+    """Write the encoded JPEG once and point the model field at it.
+
+    The update bypasses save(), so blob references are moved here. A file
+    rejected because the image changed meanwhile is left to gc_report_images.
+    """
+    field_file = getattr(job.target, job.field_name)
+    storage = field_file.storage
+    old_name = field_file.name
+
+    new_name = storage.save(os.path.splitext(old_name)[0] + ".jpg", ContentFile(data))
+
+    # Only swap the name if the image wasn't replaced while we were encoding
+    model = job.content_type.model_class()
+    updated = model.objects.filter(
+        pk=job.object_id, **{job.field_name: old_name}
+    ).update(**{job.field_name: new_name})
+
+    if not updated:
+        return None
+    replace_reference(old_name, new_name)
+    if not is_blob_name(old_name) and old_name != new_name:
+        # Uploaded before content-addressed storage; nothing else points to it
+        storage.delete(old_name)
+    return new_name
+
+
+def encode_upload(data):
+    """Pool task: the compressed JPEG plus all of its renditions."""
+    encoded = encode_jpeg(data)
+    return encoded, render_all(encoded)
+
+
+def _store_result(job, data, result):
+    if job.kind == "RENDITIONS":
+        store_renditions(getattr(job.target, job.field_name).name, data, result)
+        return
+    encoded, rendered = result
+    name = store_encoded(job, encoded)
+    if name:
+        store_renditions(name, encoded, rendered)
+
+
+# ==============================
+# QUEUE
+# ==============================
+def _set_image_status(job, status):
+    if job.kind != "ENCODE":
+        # The stored image itself is unchanged
+        return
+    model = job.content_type.model_class()
+    if any(field.name == "image_status" for field in model._meta.fields):
+        model.objects.filter(pk=job.object_id).update(image_status=status)
+
+
+def queue_image_job(instance, field_name="image", kind="ENCODE"):
+    """Record a compression job for a freshly uploaded image.
+
+    ``kind="RENDITIONS"`` only renders the missing renditions of an image
+    that is already stored.
+    """
+    job = ImageJob.objects.create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field_name=field_name,
+        kind=kind,
+    )
+    if IMAGE_JOBS_INLINE:
+        transaction.on_commit(lambda: run_jobs(claim_jobs(ids=[job.pk])))
+    return job
+
+
+def queue_renditions(instance, field_name="image"):
+    """Queue a renditions job unless a job for the image is still pending.
+
+    The upload's own job stores the renditions when it finishes.
+    """
+    unfinished = ImageJob.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field_name=field_name,
+        status__in=("PENDING", "RUNNING"),
+    )
+    if not unfinished.exists():
+        queue_image_job(instance, field_name, kind="RENDITIONS")
+
+
+def claim_jobs(limit=10, ids=None):
+    """Lock and mark up to ``limit`` pending jobs as RUNNING.
+
+    ``SKIP LOCKED`` lets several workers poll the table without handing out
+    the same job twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = ImageJob.objects.select_for_update(skip_locked=True).filter(
+            Q(status="PENDING") | Q(status="RUNNING", updated_at__lt=now - STALE_AFTER)
+        )
+        if ids is not None:
+            jobs = jobs.filter(pk__in=ids)
+        claimed = list(jobs.order_by("created_at").values_list("pk", flat=True)[:limit])
+
+        ImageJob.objects.filter(pk__in=claimed).update(
+            status="RUNNING", attempts=F("attempts") + 1, updated_at=now
+        )
+
+    return list(
+        ImageJob.objects.filter(pk__in=claimed)
+        .select_related("content_type")
+        .prefetch_related("target")
+    )
+
+
+def _finish(job, error=None):
+    if error is None:
+        job.status = "DONE"
+        job.last_error = ""
+        _set_image_status(job, "READY")
+    elif job.attempts >= MAX_ATTEMPTS:
+        job.status = "FAILED"
+        job.last_error = error
+        _set_image_status(job, "FAILED")
+    else:
+        job.status = "PENDING"
+        job.last_error = error
+    job.save(update_fields=["status", "last_error", "updated_at"])
+
+
+def run_jobs(jobs, executor=None):
+    """Encode the images of claimed jobs, in ``executor`` if given.
+
+    Only bytes cross the process boundary; reading and writing storage stays
+    in this process.
+    """
+    pending = []
+    for job in jobs:
+        if job.target is None:
+            _finish(job, "Target no longer exists")
+            continue
+
+        _set_image_status(job, "PROCESSING")
+        try:
+            data = read_image(job)
+        except Exception as e:
+            _finish(job, str(e))
+            continue
+
+        task = render_all if job.kind == "RENDITIONS" else encode_upload
+        if executor is None:
+            pending.append((job, task, None, data))
+        else:
+            pending.append((job, task, executor.submit(task, data), data))
+
+    for job, task, future, data in pending:
+        try:
+            _store_result(job, data, future.result() if future else task(data))
+        except Exception as e:
+            _finish(job, str(e))
+        else:
+            _finish(job)
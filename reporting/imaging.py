@@ -0,0 +1,75 @@
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+MAX_BYTES = 1024 * 1024
+MAX_DIMENSION = 1280
+MIN_QUALITY = 20
+MAX_QUALITY = 85
+
+# Refuse to decode anything larger (decompression bombs); ~50 megapixels
+# is well above any phone camera.
+MAX_PIXELS = 50_000_000
+
+
+def open_image(data, max_dimension=MAX_DIMENSION):
+    """Open image bytes, downscaling JPEGs while decoding when possible."""
+    img = Image.open(BytesIO(data))
+
+    width, height = img.size
+    if width * height > MAX_PIXELS:
+        raise ValueError(f"Image too large: {width}x{height}")
+
+    # JPEG only: let libjpeg decode at 1/2, 1/4 or 1/8 scale
+    img.draft("RGB", (max_dimension, max_dimension))
+
+    # Phone photos store rotation in EXIF, which re-encoding drops
+    img = ImageOps.exif_transpose(img)
+
+    # Convert to RGB for non-JPEG images
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    return img
+
+
+def _encode(img, quality):
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def encode_jpeg(data, max_bytes=MAX_BYTES, max_dimension=MAX_DIMENSION):
+    """Re-encode image bytes as a JPEG of at most ``max_bytes``.
+
+    Works entirely in memory and binary-searches the highest quality that
+    fits, so it needs O(log n) encodes instead of stepping down 5 at a time.
+    Falls back to MIN_QUALITY if nothing fits.
+    """
+    img = open_image(data, max_dimension)
+
+    encoded = _encode(img, MAX_QUALITY)
+    if len(encoded) <= max_bytes:
+        return encoded
+
+    best = None
+    low, high = MIN_QUALITY, MAX_QUALITY - 1
+    while low <= high:
+        quality = (low + high) // 2
+        encoded = _encode(img, quality)
+        if len(encoded) <= max_bytes:
+            best = encoded
+            low = quality + 1
+        else:
+            high = quality - 1
+            if quality == MIN_QUALITY:
+                # Nothing fits; keep the smallest attempt
+                best = encoded
+
+    return best
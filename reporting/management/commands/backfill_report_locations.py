@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from reporting.models import PropertyReport
+
+BACKFILL_SQL = """
+    UPDATE {table}
+    SET location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+    WHERE id >= %s AND id < %s
+      AND latitude IS NOT NULL AND longitude IS NOT NULL
+      AND location IS NULL
+"""
+
+
+class Command(BaseCommand):
+    help = "Fill PropertyReport.location from latitude/longitude in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        sql = BACKFILL_SQL.format(table=PropertyReport._meta.db_table)
+
+        ids = PropertyReport.objects.order_by("id").values_list("id", flat=True)
+        first, last = ids.first(), ids.last()
+        if first is None:
+            self.stdout.write("No reports to backfill")
+            return
+
+        updated = 0
+        # Walk the primary key range so each UPDATE touches one batch
+        for start in range(first, last + 1, batch_size):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [start, start + batch_size])
+                updated += cursor.rowcount
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} report locations"))
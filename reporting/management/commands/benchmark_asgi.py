@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from reporting.benchmarks import benchmark_environment, run_load_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI (sync views, threads) and ASGI (async views, one event "
+        "loop) throughput under concurrent load, against a seeded test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=10000, help="Reports to seed")
+        parser.add_argument(
+            "--concurrency",
+            type=lambda value: sorted(int(level) for level in value.split(",")),
+            default=[1, 8, 32],
+            help="Comma-separated numbers of requests in flight, e.g. 1,8,32",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests per interface and concurrency level",
+        )
+        parser.add_argument(
+            "--upload-every",
+            type=int,
+            default=5,
+            help="Make every Nth request a report upload (0 disables uploads)",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database (and its seeded reports) between runs",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["concurrency"]) < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be positive")
+
+        self.stdout.write(f"Seeding {options['size']} reports...")
+        with benchmark_environment(keepdb=options["keepdb"]):
+            results = run_load_suite(
+                options["size"],
+                options["concurrency"],
+                options["requests"],
+                upload_every=options["upload_every"],
+            )
+
+        self.stdout.write(
+            f"\n{'interface':<11}{'conc.':>6}{'req/s':>9}{'p50 ms':>9}"
+            f"{'p95 ms':>9}{'max ms':>9}{'errors':>8}"
+        )
+        for r in results:
+            line = (
+                f"{r.interface:<11}{r.concurrency:>6}{r.throughput:>9.1f}"
+                f"{r.p50_ms:>9.1f}{r.p95_ms:>9.1f}{r.max_ms:>9.1f}{r.errors:>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if r.errors else line)
+
+        if any(r.errors for r in results):
+            raise CommandError("Some requests failed; see the errors column")
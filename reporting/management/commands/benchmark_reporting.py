@@ -0,0 +1,84 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reporting.benchmarks import (
+    benchmark_environment,
+    compare,
+    load_baseline,
+    run_suite,
+    save_baseline,
+)
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "benchmarks", "reporting.json")
+
+
+class Command(BaseCommand):
+    help = "Benchmark the reporting pages and imports against a seeded test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=lambda value: sorted(int(size) for size in value.split(",")),
+            default=[1000],
+            help="Comma-separated report counts to measure at, e.g. 1000,100000",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store these results as the new baseline",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown/memory growth as a fraction (0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database (and its seeded reports) between runs",
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        with benchmark_environment(keepdb=options["keepdb"]) as workdir:
+            for size in options["sizes"]:
+                self.stdout.write(f"Seeding and measuring {size} reports...")
+                results += run_suite(size, options["repeat"], workdir)
+
+        baseline = load_baseline(options["baseline"])
+        regressions = compare(results, baseline, options["threshold"])
+        flagged = {(m.name, m.size): [] for m, _, _ in regressions}
+        for m, metric, _ in regressions:
+            flagged[(m.name, m.size)].append(metric)
+
+        self.stdout.write(
+            f"\n{'path':<24}{'reports':>10}{'seconds':>10}{'queries':>9}{'peak KB':>10}"
+        )
+        for m in results:
+            line = (
+                f"{m.name:<24}{m.size:>10}{m.seconds:>10.4f}"
+                f"{m.queries:>9}{m.peak_kb:>10}"
+            )
+            if (m.name, m.size) in flagged:
+                line = self.style.ERROR(
+                    f"{line}  regressed: {', '.join(flagged[(m.name, m.size)])}"
+                )
+            self.stdout.write(line)
+
+        if options["save_baseline"]:
+            os.makedirs(os.path.dirname(options["baseline"]), exist_ok=True)
+            save_baseline(options["baseline"], results, baseline)
+            self.stdout.write(
+                self.style.SUCCESS(f"Baseline saved to {options['baseline']}")
+            )
+        elif regressions:
+            details = "; ".join(
+                f"{m.name}@{m.size} {metric} {getattr(m, metric)} (baseline {base})"
+                for m, metric, base in regressions
+            )
+            raise CommandError(f"{len(regressions)} regressions: {details}")
+        elif baseline:
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
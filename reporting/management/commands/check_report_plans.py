@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reporting.filters import filter_period
+from reporting.models import PropertyReport, ReportDailyStats
+
+
+def plan_cases():
+    """(name, queryset, acceptable indexes, planner settings) per access path."""
+    reports = PropertyReport.objects.only("id")
+    january = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    february = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+    return [
+        (
+            "dashboard month by status",
+            filter_period(reports, 2024, 5).filter(status="OPEN"),
+            ["report_date_status_idx"],
+            {},
+        ),
+        (
+            "resident's reports",
+            reports.filter(reported_by_id=1).order_by("-created_at"),
+            ["report_reporter_created_idx"],
+            {},
+        ),
+        (
+            "open queue",
+            reports.filter(status="OPEN").order_by("-created_at", "-id")[:50],
+            ["report_status_created_idx"],
+            {},
+        ),
+        (
+            "created_at range",
+            reports.filter(created_at__gte=january, created_at__lt=february),
+            ["report_created_idx"],
+            {},
+        ),
+        (
+            "rollup period",
+            filter_period(ReportDailyStats.objects.only("id"), 2024),
+            ["unique_report_daily_stats"],
+            {},
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the reporting queries and check each uses its intended index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--real-costs",
+            action="store_true",
+            help="Don't disable sequential scans (small tables will seq scan)",
+        )
+        parser.add_argument("--verbose-plans", action="store_true")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Query plans can only be checked on PostgreSQL")
+
+        failures = []
+        for name, queryset, indexes, planner in plan_cases():
+            settings = dict(planner)
+            if not options["real_costs"]:
+                # Prove the index is usable, whatever the table size
+                settings["enable_seqscan"] = "off"
+
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for key, value in settings.items():
+                        cursor.execute(f"SET LOCAL {key} = {value}")
+                plan = queryset.explain()
+                transaction.set_rollback(True)
+
+            used = [index for index in indexes if index in plan]
+            if used:
+                self.stdout.write(self.style.SUCCESS(f"OK    {name}: {used[0]}"))
+            else:
+                failures.append(name)
+                self.stdout.write(
+                    self.style.ERROR(f"FAIL  {name}: expected {' or '.join(indexes)}")
+                )
+            if options["verbose_plans"] or not used:
+                for line in plan.splitlines():
+                    self.stdout.write(f"      {line}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} queries not using their index")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from reporting import tiles
+
+
+class Command(BaseCommand):
+    help = "Invalidate cached vector tiles and remove stale tile directories"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--layer",
+            action="append",
+            help="Layer to invalidate (repeatable, default: all layers)",
+        )
+
+    def handle(self, *args, **options):
+        layers = options["layer"] or list(tiles.LAYERS)
+
+        for layer in layers:
+            if layer not in tiles.LAYERS:
+                raise CommandError(f"Unknown layer: {layer}")
+            tiles.bump_layer(layer)
+
+        removed = tiles.clear_stale_versions()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Invalidated {', '.join(layers)}; removed {removed} stale tile sets"
+            )
+        )
@@ -0,0 +1,73 @@
+import shutil
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+from reporting import exports
+from reporting.db_router import replica_reads
+
+
+class Command(BaseCommand):
+    help = "Export PropertyReports to CSV, NDJSON (GeoJSON features) or XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=str, help="File to write")
+        parser.add_argument(
+            "--format",
+            choices=exports.available_formats(),
+            default=None,
+            help="Defaults to the output's extension; xlsx needs xlsxwriter",
+        )
+        parser.add_argument("--year", type=str)
+        parser.add_argument("--month", type=str)
+        parser.add_argument("--status", type=str)
+        parser.add_argument("--violation", type=str)
+        parser.add_argument("--fine-paid", type=str, help="yes or no")
+        parser.add_argument("--chunk-size", type=int, default=exports.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        fmt = options["format"] or output.rsplit(".", 1)[-1].lower()
+        if fmt not in exports.available_formats():
+            raise CommandError(
+                f"Unsupported format {fmt!r}; available: "
+                f"{', '.join(exports.available_formats())}"
+            )
+
+        # Same parsing (and validation) as the web export
+        params = QueryDict(mutable=True)
+        for key in ("year", "month", "status", "violation", "fine_paid"):
+            if options[key]:
+                params[key] = options[key]
+        filters = exports.parse_export_filters(params)
+
+        with replica_reads():
+            rows = exports.export_rows(filters, chunk_size=options["chunk_size"])
+            counted = _Counter(rows)
+
+            if fmt == "xlsx":
+                with exports.xlsx_tempfile(counted) as tmp, open(output, "wb") as f:
+                    shutil.copyfileobj(tmp, f)
+            else:
+                lines = (
+                    exports.iter_csv(counted)
+                    if fmt == "csv"
+                    else exports.iter_ndjson(counted)
+                )
+                with open(output, "w", newline="", encoding="utf-8") as f:
+                    f.writelines(lines)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {counted.count} reports to {output}")
+        )
+
+
+class _Counter:
+    """Pass rows through while counting them."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from reporting.blobs import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = "Delete report image blobs that are no longer referenced"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep unreferenced files newer than this",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompute reference counts from the database first",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="List blobs without deleting"
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            blobs = recount_references()
+            self.stdout.write(f"Recounted references for {blobs} blobs")
+
+        removed = collect_garbage(
+            grace_seconds=options["grace_hours"] * 3600, dry_run=options["dry_run"]
+        )
+
+        for name in removed:
+            self.stdout.write(f"  {name}")
+        verb = "Would remove" if options["dry_run"] else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(removed)} orphaned blobs"))
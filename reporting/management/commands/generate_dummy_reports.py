@@ -1,10 +1,21 @@
-from datetime import datetime, timedelta
-import random
-from django.core.management.base import BaseCommand
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
-from reporting.models import PropertyReport, ViolationType
-from shapely.geometry import Point, shape
-import json
+from reporting import cache, tiles
+from reporting.models import ViolationType
+from reporting.rollups import rebuild_daily_stats
+from reporting.synthetic import ESTATE_BOUNDARY, ReportGenerator, date_distribution
+from shapely.geometry import shape
+
+
+def parse_year_weights(value):
+    """'2023=1,2024=2.5' -> {2023: 1.0, 2024: 2.5}"""
+    try:
+        pairs = (item.split("=") for item in value.split(",") if item)
+        return {int(year): float(weight) for year, weight in pairs}
+    except ValueError:
+        raise CommandError("--year-weights must look like 2023=1,2024=2.5")
 
 
 class Command(BaseCommand):
@@ -12,93 +23,80 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--count", type=int, default=500)
+        parser.add_argument(
+            "--chunk-size", type=int, default=10000, help="Reports per bulk insert"
+        )
+        parser.add_argument(
+            "--start", type=date.fromisoformat, default=date(2020, 1, 1)
+        )
+        parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+        parser.add_argument(
+            "--year-weights",
+            type=parse_year_weights,
+            default=None,
+            help="Relative volume per year, e.g. 2023=1,2024=2.5",
+        )
+        parser.add_argument(
+            "--seasonal",
+            type=float,
+            default=0.0,
+            help="Seasonal swing from 0 (flat) to 1",
+        )
+        parser.add_argument(
+            "--peak-month", type=int, default=1, help="Month with the most reports"
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--resolve-stands",
+            action="store_true",
+            help="Link the new reports to their nearest stand afterwards",
+        )
 
     def handle(self, *args, **options):
         count = options["count"]
+        if options["start"] > options["end"]:
+            raise CommandError("--start must be before --end")
+        if not 0 <= options["seasonal"] <= 1:
+            raise CommandError("--seasonal must be between 0 and 1")
 
-        # ----------------------------------
-        # 1️⃣ Load your GeoJSON boundary
-        # ----------------------------------
-        geojson = {
-            "type": "FeatureCollection",
-            "features": [
-                {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "MultiPolygon",
-                        "coordinates": [
-                            [
-                                [
-                                    [31.072844583999419, -17.900947122786324],
-                                    [31.077399827519841, -17.898723730115641],
-                                    [31.078213263862775, -17.902194391845487],
-                                    [31.081955071040266, -17.901109810054912],
-                                    [31.081250092876388, -17.897639148325066],
-                                    [31.085317274591052, -17.897096857429776],
-                                    [31.088462561783725, -17.902194391845487],
-                                    [31.0895471435743, -17.903875493620884],
-                                    [31.079352074742879, -17.911087962528217],
-                                    [31.076749078445495, -17.906749635365912],
-                                    [31.072844583999419, -17.900947122786324],
-                                ]
-                            ]
-                        ],
-                    },
-                }
-            ],
-        }
-
-        polygon = shape(geojson["features"][0]["geometry"])
-
-        # Bounding box (auto from polygon)
-        minx, miny, maxx, maxy = polygon.bounds
-
-        # ----------------------------------
-        # 2️⃣ Setup DB Data
-        # ----------------------------------
         user, _ = User.objects.get_or_create(
             username="testuser", defaults={"email": "test@example.com"}
         )
 
         violations = list(ViolationType.objects.filter(is_active=True))
+        if not violations:
+            raise CommandError("No active violation types to generate reports for")
+
+        days, weights = date_distribution(
+            options["start"],
+            options["end"],
+            year_weights=options["year_weights"],
+            seasonal=options["seasonal"],
+            peak_month=options["peak_month"],
+        )
+        generator = ReportGenerator(
+            shape(ESTATE_BOUNDARY),
+            violations,
+            user,
+            days,
+            weights,
+            seed=options["seed"],
+        )
 
-        statuses = ["OPEN", "IN_PROGRESS", "RESOLVED", "APPROVED"]
-
-        start_date = datetime(2020, 1, 1)
-        end_date = datetime.today()
-
-        created = 0
-
-        while created < count:
-            # Random date
-            delta_days = random.randint(0, (end_date - start_date).days)
-            report_date = start_date + timedelta(days=delta_days)
-
-            # Generate random point inside bounding box
-            lon = random.uniform(minx, maxx)
-            lat = random.uniform(miny, maxy)
-
-            point = Point(lon, lat)
-
-            # Check if inside polygon
-            if polygon.contains(point):
-
-                violation = random.choice(violations)
+        created = generator.generate(
+            count,
+            chunk_size=options["chunk_size"],
+            progress=lambda n: self.stdout.write(f"  {n}/{count}"),
+        )
 
-                PropertyReport.objects.create(
-                    reported_by=user,
-                    house_number=f"H-{random.randint(1,150)}",
-                    violation=violation,
-                    description=f"Dummy report {created+1}",
-                    fine_amount=violation.fine_amount,
-                    status=random.choice(statuses),
-                    latitude=lat,
-                    longitude=lon,
-                    report_date=report_date,
-                )
+        # Bulk inserts skip the signals: refresh rollups, caches and tiles
+        rebuild_daily_stats()
+        cache.bump_all()
+        tiles.bump_layer("reports")
 
-                created += 1
+        if options["resolve_stands"]:
+            call_command("resolve_report_stands", stdout=self.stdout)
 
         self.stdout.write(
-            self.style.SUCCESS(f"Created {count} reports inside boundary!")
+            self.style.SUCCESS(f"Created {created} reports inside boundary!")
         )
@@ -0,0 +1,34 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from reporting.image_jobs import claim_jobs, run_jobs
+
+
+class Command(BaseCommand):
+    help = "Compress uploaded report images from the ImageJob queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+
+        # Pillow work runs in child processes; the DB is only touched here
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            while True:
+                jobs = claim_jobs(limit=options["batch_size"])
+                if jobs:
+                    run_jobs(jobs, executor)
+                    processed += len(jobs)
+                    self.stdout.write(f"Processed {processed} image jobs")
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {processed} image jobs"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from reporting.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ReportDailyStats rollup from PropertyReport"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild_daily_stats(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily stats rows"))
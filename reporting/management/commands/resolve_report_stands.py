@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from accounts.models import Stand
+from reporting.models import PropertyReport
+
+RESOLVE_SQL = """
+    UPDATE {reports} r
+    SET stand_id = (
+        SELECT s.id FROM {stands} s
+        WHERE s.location IS NOT NULL
+        ORDER BY s.location <-> r.location
+        LIMIT 1
+    )
+    WHERE r.id >= %s AND r.id < %s
+      AND r.location IS NOT NULL
+"""
+
+
+class Command(BaseCommand):
+    help = "Link PropertyReports to their nearest Stand in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-resolve reports that already have a stand",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        sql = RESOLVE_SQL.format(
+            reports=PropertyReport._meta.db_table, stands=Stand._meta.db_table
+        )
+        if not options["all"]:
+            sql += "  AND r.stand_id IS NULL\n"
+
+        ids = PropertyReport.objects.order_by("id").values_list("id", flat=True)
+        first, last = ids.first(), ids.last()
+        if first is None:
+            self.stdout.write("No reports to resolve")
+            return
+
+        updated = 0
+        # One UPDATE per id range; each row does a KNN lookup on the stand index
+        for start in range(first, last + 1, batch_size):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [start, start + batch_size])
+                updated += cursor.rowcount
+            self.stdout.write(f"Resolved up to id {start + batch_size - 1}")
+
+        self.stdout.write(self.style.SUCCESS(f"Linked {updated} reports to stands"))
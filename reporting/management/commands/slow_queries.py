@@ -0,0 +1,75 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+from reporting.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = "Summarize the slowest query shapes recorded in the slow query log"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument(
+            "--hours", type=float, default=None, help="Only the last N hours"
+        )
+        parser.add_argument(
+            "--plans", action="store_true", help="Print the latest plan of each"
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Empty the log and exit"
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} entries"))
+            return
+
+        entries = SlowQuery.objects.all()
+        if options["hours"]:
+            since = timezone.now() - timedelta(hours=options["hours"])
+            entries = entries.filter(created_at__gte=since)
+
+        # Worst offenders by total time spent
+        offenders = (
+            entries.order_by()
+            .values("fingerprint")
+            .annotate(
+                count=Count("id"),
+                total_ms=Sum("duration_ms"),
+                avg_ms=Avg("duration_ms"),
+                max_ms=Max("duration_ms"),
+                last_id=Max("id"),
+            )
+            .order_by("-total_ms")[: options["top"]]
+        )
+
+        if not offenders:
+            self.stdout.write("No slow queries recorded")
+            return
+
+        for rank, row in enumerate(offenders, start=1):
+            latest = SlowQuery.objects.get(pk=row["last_id"])
+            self.stdout.write(
+                self.style.WARNING(
+                    f"#{rank}  {row['count']}x  total {row['total_ms']:.0f} ms  "
+                    f"avg {row['avg_ms']:.0f} ms  max {row['max_ms']:.0f} ms"
+                )
+            )
+            self.stdout.write(
+                f"    origin: {latest.origin or 'unknown'} ({latest.database})"
+            )
+            self.stdout.write(f"    sql:    {latest.sql[:500]}")
+
+            if options["plans"]:
+                with_plan = (
+                    entries.filter(fingerprint=row["fingerprint"])
+                    .exclude(plan="")
+                    .only("plan")
+                    .first()
+                )
+                if with_plan:
+                    for line in with_plan.plan.splitlines():
+                        self.stdout.write(f"      {line}")
+            self.stdout.write("")
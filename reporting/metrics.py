@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+# Requests kept for the metrics page, per process
+BUFFER_SIZE = getattr(settings, "REQUEST_METRICS_BUFFER", 1000)
+
+# A statement seen this often in one request is reported as a duplicate
+DUPLICATE_THRESHOLD = 2
+
+# The recorder of the request being handled on this thread/task
+current = ContextVar("request_metrics", default=None)
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Statement shape: params are already %s; IN lists of any length match."""
+    return _SPACE_RE.sub(" ", _IN_LIST_RE.sub("IN (...)", sql)).strip()
+
+
+# ==============================
+# PER-REQUEST RECORDING
+# ==============================
+@dataclass
+class RequestRecorder:
+    """Numbers for one request, fed by ``query_recorder``.
+
+    Async views may run queries for the same request on several threads at
+    once, hence the lock.
+    """
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    template_seconds: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.db_seconds += elapsed
+                self.queries += 1
+                self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count >= DUPLICATE_THRESHOLD
+        ]
+
+
+def query_recorder(execute, sql, params, many, context):
+    """Execute wrapper on every connection; forwards to the current request.
+
+    The recorder travels in a context variable, which sync_to_async copies to
+    its worker threads, so queries on any thread or connection are counted.
+    """
+    recorder = current.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    """connection_created receiver: wrap every new connection."""
+    if query_recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_recorder)
+
+
+def add_template_time(seconds):
+    recorder = current.get()
+    if recorder is not None:
+        recorder.template_seconds += seconds
+
+
+@dataclass
+class RequestMetric:
+    view: str
+    method: str
+    status: int
+    seconds: float
+    db_seconds: float
+    queries: int
+    template_seconds: float
+    duplicates: list
+    timestamp: float
+
+
+# ==============================
+# STORE
+# ==============================
+_lock = threading.Lock()
+_recent = deque(maxlen=BUFFER_SIZE)
+
+# Monotonic per-view counters for Prometheus
+COUNTERS = (
+    "requests",
+    "seconds",
+    "db_seconds",
+    "queries",
+    "duplicate_queries",
+    "template_seconds",
+)
+_totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+
+def record(metric):
+    with _lock:
+        _recent.append(metric)
+        totals = _totals[metric.view]
+        totals["requests"] += 1
+        totals["seconds"] += metric.seconds
+        totals["db_seconds"] += metric.db_seconds
+        totals["queries"] += metric.queries
+        totals["duplicate_queries"] += sum(n - 1 for _, n in metric.duplicates)
+        totals["template_seconds"] += metric.template_seconds
+
+
+def recent():
+    with _lock:
+        return list(_recent)
+
+
+def totals():
+    with _lock:
+        return {view: dict(values) for view, values in _totals.items()}
+
+
+def reset():
+    with _lock:
+        _recent.clear()
+        _totals.clear()
+
+
+# ==============================
+# REPORTING
+# ==============================
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def view_summary(metrics=None):
+    """Per-view aggregates of the ring buffer, busiest DB time first."""
+    by_view = defaultdict(list)
+    for metric in recent() if metrics is None else metrics:
+        by_view[metric.view].append(metric)
+
+    rows = []
+    for view, items in by_view.items():
+        n = len(items)
+        duplicates = Counter()
+        for metric in items:
+            for sql, count in metric.duplicates:
+                duplicates[sql] = max(duplicates[sql], count)
+        rows.append(
+            {
+                "view": view,
+                "requests": n,
+                "avg_ms": sum(m.seconds for m in items) / n * 1000,
+                "p95_ms": _percentile([m.seconds for m in items], 95) * 1000,
+                "avg_db_ms": sum(m.db_seconds for m in items) / n * 1000,
+                "total_db_ms": sum(m.db_seconds for m in items) * 1000,
+                "avg_queries": sum(m.queries for m in items) / n,
+                "max_queries": max(m.queries for m in items),
+                "avg_template_ms": sum(m.template_seconds for m in items) / n * 1000,
+                "with_duplicates": sum(1 for m in items if m.duplicates),
+                "top_duplicates": duplicates.most_common(3),
+            }
+        )
+    return sorted(rows, key=lambda row: row["total_db_ms"], reverse=True)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Counters in the Prometheus text exposition format."""
+    metrics = [
+        ("requests", "requests_total", "Requests handled"),
+        ("seconds", "request_seconds_total", "Time spent in the view"),
+        ("db_seconds", "db_seconds_total", "Time spent in database queries"),
+        ("queries", "db_queries_total", "Database queries executed"),
+        (
+            "duplicate_queries",
+            "db_duplicate_queries_total",
+            "Repeated identical statements (likely N+1)",
+        ),
+        ("template_seconds", "template_seconds_total", "Time spent rendering"),
+    ]
+    snapshot = totals()
+
+    lines = []
+    for key, name, help_text in metrics:
+        name = f"django_view_{name}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for view, values in sorted(snapshot.items()):
+            lines.append(f'{name}{{view="{_label(view)}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,162 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import db_router, metrics
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RequestMetricsMiddleware:
+    """Record time, DB time, queries and template time for every request.
+
+    Goes first in MIDDLEWARE so the numbers cover the whole stack. For
+    streaming responses only the time until the first byte is counted.
+    Async-capable, so ASGI requests to async views stay on the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        recorder = metrics.RequestRecorder()
+        token = metrics.current.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        self.record(request, response, recorder, start)
+        return response
+
+    async def __acall__(self, request):
+        recorder = metrics.RequestRecorder()
+        token = metrics.current.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        self.record(request, response, recorder, start)
+        return response
+
+    def record(self, request, response, recorder, start):
+        match = getattr(request, "resolver_match", None)
+        metrics.record(
+            metrics.RequestMetric(
+                view=(match.view_name if match else "unresolved"),
+                method=request.method,
+                status=response.status_code,
+                seconds=time.perf_counter() - start,
+                db_seconds=recorder.db_seconds,
+                queries=recorder.queries,
+                template_seconds=recorder.template_seconds,
+                duplicates=recorder.duplicates()[:5],
+                timestamp=time.time(),
+            )
+        )
+
+
+class ReplicaPinningMiddleware:
+    """Routing state for ReplicaRouter, one per request.
+
+    Unsafe methods, and clients that wrote within the last PIN_SECONDS (the
+    pin cookie), read from the primary. Streamed responses keep the state
+    while their content is read. Not used when no replicas are configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not db_router.replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        state = self.state_for(request)
+        token = db_router.current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.current.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state = self.state_for(request)
+        token = db_router.current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db_router.current.reset(token)
+        return self.finish(state, response)
+
+    def state_for(self, request):
+        return db_router.RoutingState(
+            pinned=(
+                request.method not in SAFE_METHODS
+                or db_router.PIN_COOKIE in request.COOKIES
+            )
+        )
+
+    def finish(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                db_router.PIN_COOKIE,
+                "1",
+                max_age=db_router.PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        # FileResponses are already built; wrapping would disable sendfile
+        if (
+            response.streaming
+            and state.use_replica
+            and getattr(response, "file_to_stream", None) is None
+        ):
+            wrap = _aiter_in_state if response.is_async else _iter_in_state
+            response.streaming_content = wrap(state, response.streaming_content)
+        return response
+
+
+def _iter_in_state(state, content):
+    """Read each chunk with ``state`` current, without leaking it in between."""
+    iterator = iter(content)
+    while True:
+        token = db_router.current.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            db_router.current.reset(token)
+        yield chunk
+
+
+async def _aiter_in_state(state, content):
+    iterator = aiter(content)
+    while True:
+        token = db_router.current.set(state)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            db_router.current.reset(token)
+        yield chunk
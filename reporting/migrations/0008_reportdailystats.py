@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_daily_stats(apps, schema_editor):
+    PropertyReport = apps.get_model('reporting', 'PropertyReport')
+    ReportDailyStats = apps.get_model('reporting', 'ReportDailyStats')
+
+    grouped = (
+        PropertyReport.objects.order_by()
+        .values('report_date', 'violation_id', 'status')
+        .annotate(report_count=Count('id'), fine_total=Sum('fine_amount'))
+    )
+    ReportDailyStats.objects.bulk_create(
+        [
+            ReportDailyStats(
+                report_date=entry['report_date'],
+                violation_id=entry['violation_id'],
+                status=entry['status'],
+                report_count=entry['report_count'],
+                fine_total=entry['fine_total'] or 0,
+            )
+            for entry in grouped
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0007_alter_propertyreport_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_date', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('IN_PROGRESS', 'In Progress'), ('RESOLVED', 'Resolved'), ('APPROVED', 'Approved')], max_length=20)),
+                ('report_count', models.IntegerField(default=0)),
+                ('fine_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('violation', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reporting.violationtype')),
+            ],
+            options={
+                'verbose_name_plural': 'Report daily stats',
+                'constraints': [models.UniqueConstraint(fields=('report_date', 'violation', 'status'), name='unique_report_daily_stats')],
+            },
+        ),
+        migrations.RunPython(populate_daily_stats, migrations.RunPython.noop),
+    ]
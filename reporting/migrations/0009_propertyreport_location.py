@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:14
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0008_reportdailystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyreport',
+            name='location',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, null=True, srid=4326),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE reporting_propertyreport
+            SET location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
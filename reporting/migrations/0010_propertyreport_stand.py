@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_remove_resident_account_status_and_more'),
+        ('reporting', '0009_propertyreport_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyreport',
+            name='stand',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='accounts.stand'),
+        ),
+    ]
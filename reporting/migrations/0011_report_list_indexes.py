@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_remove_resident_account_status_and_more'),
+        ('reporting', '0010_propertyreport_stand'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='propertyreport',
+            index=models.Index(fields=['created_at', 'id'], name='report_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyreport',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='report_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyreport',
+            index=models.Index(fields=['violation', 'created_at', 'id'], name='report_violation_created_idx'),
+        ),
+    ]
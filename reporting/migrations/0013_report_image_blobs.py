@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:20
+
+import reporting.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0012_imagejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refcount', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='propertyreport',
+            name='image',
+            field=models.ImageField(blank=True, default='reports/default.png', null=True, storage=reporting.storage.report_image_storage, upload_to='reports/'),
+        ),
+        migrations.AlterField(
+            model_name='reportimage',
+            name='image',
+            field=models.ImageField(storage=reporting.storage.report_image_storage, upload_to='reports/'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:26
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking report writes
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0004_remove_resident_account_status_and_more'),
+        ('reporting', '0014_slowquery'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='propertyreport',
+            index=models.Index(fields=['report_date', 'status'], name='report_date_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='propertyreport',
+            index=models.Index(fields=['reported_by', 'created_at'], name='report_reporter_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='propertyreport',
+            index=models.Index(condition=models.Q(('status', 'OPEN')), fields=['created_at', 'id'], name='report_open_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='propertyreport',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='report_created_brin'),
+        ),
+    ]
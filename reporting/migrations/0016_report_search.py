@@ -0,0 +1,121 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:28
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# search_vector = house number and violation (A), description (B) and
+# comments (C), kept current by triggers on all three tables
+SEARCH_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION reporting_report_search_vector(
+    report_id bigint, house_number text, description text, violation_id bigint
+) RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector('english', coalesce(house_number, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(
+            (SELECT name FROM reporting_violationtype WHERE id = violation_id), ''
+        )), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(
+            (SELECT string_agg(comment, ' ') FROM reporting_reportcomment
+             WHERE reporting_reportcomment.report_id = $1), ''
+        )), 'C')
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION reporting_report_search_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := reporting_report_search_vector(
+        NEW.id, NEW.house_number, NEW.description, NEW.violation_id
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reporting_report_search
+    BEFORE INSERT OR UPDATE OF house_number, description, violation_id
+    ON reporting_propertyreport
+    FOR EACH ROW EXECUTE FUNCTION reporting_report_search_trigger();
+
+CREATE OR REPLACE FUNCTION reporting_comment_search_trigger() RETURNS trigger AS $$
+DECLARE
+    affected bigint;
+BEGIN
+    FOREACH affected IN ARRAY ARRAY[
+        CASE WHEN TG_OP <> 'INSERT' THEN OLD.report_id END,
+        CASE WHEN TG_OP <> 'DELETE' THEN NEW.report_id END
+    ] LOOP
+        CONTINUE WHEN affected IS NULL;
+        UPDATE reporting_propertyreport r
+        SET search_vector = reporting_report_search_vector(
+            r.id, r.house_number, r.description, r.violation_id
+        )
+        WHERE r.id = affected;
+    END LOOP;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reporting_comment_search
+    AFTER INSERT OR UPDATE OR DELETE ON reporting_reportcomment
+    FOR EACH ROW EXECUTE FUNCTION reporting_comment_search_trigger();
+
+CREATE OR REPLACE FUNCTION reporting_violation_search_trigger() RETURNS trigger AS $$
+BEGIN
+    UPDATE reporting_propertyreport r
+    SET search_vector = reporting_report_search_vector(
+        r.id, r.house_number, r.description, r.violation_id
+    )
+    WHERE r.violation_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reporting_violation_search
+    AFTER UPDATE OF name ON reporting_violationtype
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION reporting_violation_search_trigger();
+
+UPDATE reporting_propertyreport
+SET search_vector = reporting_report_search_vector(
+    id, house_number, description, violation_id
+);
+"""
+
+DROP_SEARCH_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS reporting_violation_search ON reporting_violationtype;
+DROP TRIGGER IF EXISTS reporting_comment_search ON reporting_reportcomment;
+DROP TRIGGER IF EXISTS reporting_report_search ON reporting_propertyreport;
+DROP FUNCTION IF EXISTS reporting_violation_search_trigger();
+DROP FUNCTION IF EXISTS reporting_comment_search_trigger();
+DROP FUNCTION IF EXISTS reporting_report_search_trigger();
+DROP FUNCTION IF EXISTS reporting_report_search_vector(bigint, text, text, bigint);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_remove_resident_account_status_and_more'),
+        ('reporting', '0015_report_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='propertyreport',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(SEARCH_TRIGGERS_SQL, DROP_SEARCH_TRIGGERS_SQL),
+        migrations.AddIndex(
+            model_name='propertyreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='report_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['house_number'], name='report_house_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
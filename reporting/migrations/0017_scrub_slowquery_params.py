@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0016_report_search'),
+    ]
+
+    operations = [
+        # Rows logged before params_summary() hold raw parameter values
+        migrations.RunSQL(
+            "UPDATE reporting_slowquery SET params = ''",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+# Duplicate NULL-key rows each received every delta, so their totals can't
+# be merged; recompute the rollup from the reports (as rebuild_daily_stats)
+REBUILD_SQL = """
+DELETE FROM reporting_reportdailystats;
+INSERT INTO reporting_reportdailystats
+    (report_date, violation_id, status, report_count, fine_total)
+SELECT report_date, violation_id, status, count(*), coalesce(sum(fine_amount), 0)
+FROM reporting_propertyreport
+GROUP BY report_date, violation_id, status;
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0017_scrub_slowquery_params'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REBUILD_SQL, migrations.RunSQL.noop),
+        migrations.RemoveConstraint(
+            model_name='reportdailystats',
+            name='unique_report_daily_stats',
+        ),
+        migrations.AddConstraint(
+            model_name='reportdailystats',
+            constraint=models.UniqueConstraint(fields=('report_date', 'violation', 'status'), name='unique_report_daily_stats', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0018_report_daily_stats_nulls_not_distinct'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportdailystats',
+            name='violation',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reporting.violationtype'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0019_report_daily_stats_violation_cascade'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='kind',
+            field=models.CharField(choices=[('ENCODE', 'Compress upload'), ('RENDITIONS', 'Renditions only')], default='ENCODE', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0020_imagejob_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slowquery',
+            name='database',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:04
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # report_status_created_idx and report_created_idx already serve these
+    # access paths; drop the copies without blocking report writes
+    atomic = False
+
+    dependencies = [
+        ('reporting', '0021_slowquery_database'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='propertyreport',
+            name='report_open_created_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='propertyreport',
+            name='report_created_brin',
+        ),
+    ]
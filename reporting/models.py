@@ -1,8 +1,16 @@
-from django.db import models
+from django.conf import settings
+from django.contrib.gis.db import models
+from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.measure import D
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from .storage import report_image_storage
+import math
 import uuid
-from PIL import Image
-import os
 
 
 # ==============================
@@ -72,6 +80,90 @@ class ViolationType(models.Model):
 # ==============================
 # PROPERTY REPORT
 # ==============================
+class KNNDistance(models.Func):
+    """``location <-> point``: distance ordering served by the GiST index."""
+
+    arg_joiner = " <-> "
+    template = "(%(expressions)s)"
+    output_field = models.FloatField()
+
+
+def radius_degrees(lat, meters):
+    """Upper bound of ``meters`` in degrees at this latitude."""
+    return meters / (111320.0 * max(math.cos(math.radians(lat)), 0.01))
+
+
+class PropertyReportQuerySet(models.QuerySet):
+    def with_location(self):
+        return self.filter(location__isnull=False)
+
+    def within_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """Reports inside a lon/lat bounding box (``&&`` index scan)."""
+        bbox = Polygon.from_bbox((min_lon, min_lat, max_lon, max_lat))
+        bbox.srid = 4326
+        return self.filter(location__bboverlaps=bbox)
+
+    def within_radius(self, lon, lat, meters):
+        """Reports within ``meters`` of a point.
+
+        The degree-based ``ST_DWithin`` prefilter uses the index; the exact
+        spherical distance check then runs on the few remaining rows.
+        """
+        point = Point(lon, lat, srid=4326)
+        return self.filter(
+            location__dwithin=(point, radius_degrees(lat, meters))
+        ).filter(location__distance_lte=(point, D(m=meters)))
+
+    def nearest(self, lon, lat, k=10):
+        """The ``k`` reports closest to a point (KNN index ordering)."""
+        point = Point(lon, lat, srid=4326)
+        return (
+            self.with_location()
+            .annotate(
+                knn_distance=KNNDistance(
+                    "location",
+                    models.Value(point, output_field=models.PointField(srid=4326)),
+                )
+            )
+            .order_by("knn_distance")[:k]
+        )
+
+
+class PropertyReportManager(models.Manager.from_queryset(PropertyReportQuerySet)):
+    def get_queryset(self):
+        # Only the database reads the search vector; don't ship it to Python
+        return super().get_queryset().defer("search_vector")
+
+
+# Reports further than this from every stand are left unlinked
+STAND_MATCH_MAX_METERS = getattr(settings, "STAND_MATCH_MAX_METERS", 100)
+
+
+def nearest_stand(point, max_meters=None):
+    """Stand closest to a point, found with a KNN (``<->``) index scan.
+
+    None if no stand is within ``max_meters`` (STAND_MATCH_MAX_METERS).
+    """
+    from accounts.models import Stand
+
+    if max_meters is None:
+        max_meters = STAND_MATCH_MAX_METERS
+    return (
+        Stand.objects.filter(
+            location__dwithin=(point, radius_degrees(point.y, max_meters)),
+            location__distance_lte=(point, D(m=max_meters)),
+        )
+        .annotate(
+            knn_distance=KNNDistance(
+                "location",
+                models.Value(point, output_field=models.PointField(srid=4326)),
+            )
+        )
+        .order_by("knn_distance")
+        .first()
+    )
+
+
 class PropertyReport(models.Model):
     STATUS_CHOICES = [
         ("OPEN", "Open"),
@@ -80,17 +172,34 @@ class PropertyReport(models.Model):
         ("APPROVED", "Approved"),
     ]
 
+    IMAGE_STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("READY", "Ready"),
+        ("FAILED", "Failed"),
+    ]
+
     report_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     reported_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, related_name="reports"
     )
     house_number = models.CharField(max_length=50)
+    # Resolved from the GPS position when the report is created
+    stand = models.ForeignKey(
+        "accounts.Stand",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="reports",
+    )
     latitude = models.DecimalField(
         max_digits=9, decimal_places=6, blank=True, null=True
     )
     longitude = models.DecimalField(
         max_digits=9, decimal_places=6, blank=True, null=True
     )
+    # Kept in sync with latitude/longitude on save (GiST indexed)
+    location = models.PointField(srid=4326, null=True, blank=True)
     violation = models.ForeignKey(
         "ViolationType", on_delete=models.SET_NULL, null=True, related_name="reports"
     )
@@ -108,60 +217,145 @@ class PropertyReport(models.Model):
     # Single image (optional)
     image = models.ImageField(
         upload_to="reports/",
+        storage=report_image_storage,
         null=True,
         blank=True,
         default="reports/default.png",  # <-- default image
     )
+    image_status = models.CharField(
+        max_length=20, choices=IMAGE_STATUS_CHOICES, default="READY"
+    )
+
+    # House number, violation name, description and comments; maintained by
+    # database triggers (migration 0016), so bulk writes stay searchable
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PropertyReportManager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination and filters on report_list
+            models.Index(fields=["created_at", "id"], name="report_created_idx"),
+            models.Index(
+                fields=["status", "created_at", "id"], name="report_status_created_idx"
+            ),
+            models.Index(
+                fields=["violation", "created_at", "id"],
+                name="report_violation_created_idx",
+            ),
+            # Dashboard year/month ranges, optionally by status
+            models.Index(
+                fields=["report_date", "status"], name="report_date_status_idx"
+            ),
+            # A resident's own reports, newest first
+            models.Index(
+                fields=["reported_by", "created_at"], name="report_reporter_created_idx"
+            ),
+            # Full-text search, and fuzzy house numbers ("H12" finds "H-12")
+            GinIndex(fields=["search_vector"], name="report_search_gin"),
+            GinIndex(
+                fields=["house_number"],
+                opclasses=["gin_trgm_ops"],
+                name="report_house_trgm",
+            ),
+        ]
+
+    ROLLUP_FIELDS = ("report_date", "violation_id", "status", "fine_amount")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this row contributes to the rollup (skipped for
+        # only()/defer() loads so list views don't trigger extra queries)
+        if not instance.get_deferred_fields().intersection(cls.ROLLUP_FIELDS):
+            instance._rollup_state = instance.rollup_state()
+        return instance
+
+    def rollup_state(self):
+        """Key and values this report contributes to ReportDailyStats."""
+        return (
+            self.report_date,
+            self.violation_id,
+            self.status,
+            self.fine_amount or 0,
+        )
 
     def save(self, *args, **kwargs):
         # Set fine_amount if not set
         if self.violation and not self.fine_amount:
             self.fine_amount = self.violation.fine_amount
 
-        # Default report_date to created_at if not set
-        if not self.report_date and self.created_at:
-            self.report_date = self.created_at.date()
+        # Default report_date to created_at (or today for new reports)
+        if not self.report_date:
+            self.report_date = (self.created_at or timezone.now()).date()
+
+        # Keep the indexed point in sync with the form's lat/lon
+        if self.latitude is not None and self.longitude is not None:
+            self.location = Point(
+                float(self.longitude), float(self.latitude), srid=4326
+            )
+        else:
+            self.location = None
+
+        # Link new reports to the stand they were filed at
+        if self._state.adding and self.location and not self.stand_id:
+            self.stand = nearest_stand(self.location)
+
+        # Partially loaded rows: fetch the stored rollup key before overwriting
+        if self.pk and not hasattr(self, "_rollup_state"):
+            stored = (
+                PropertyReport.objects.filter(pk=self.pk)
+                .values_list(*self.ROLLUP_FIELDS)
+                .first()
+            )
+            if stored:
+                self._rollup_state = stored[:3] + (stored[3] or 0,)
+
+        # New upload: compressed in the background by process_image_jobs
+        new_upload = bool(self.image) and not self.image._committed
+        if new_upload:
+            self.image_status = "PENDING"
 
         super().save(*args, **kwargs)
 
-        # Compress image if exists
-        if self.image:
-            self.compress_image()
-
-    def compress_image(self):
-        """Compress uploaded image to under 1MB."""
-        try:
-            img_path = self.image.path
-            img = Image.open(img_path)
-
-            # Convert to RGB for non-JPEG images
-            if img.mode in ("RGBA", "P"):
-                if img.mode == "RGBA":
-                    background = Image.new("RGB", img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])
-                    img = background
-                else:
-                    img = img.convert("RGB")
-
-            # Resize
-            img.thumbnail((1280, 1280), Image.Resampling.LANCZOS)
-
-            # Compress to under 1MB
-            quality = 85
-            min_quality = 20
-            while True:
-                img.save(img_path, format="JPEG", quality=quality, optimize=True)
-                size = os.path.getsize(img_path)
-                if size <= 1024 * 1024 or quality <= min_quality:
-                    break
-                quality -= 5
-        except Exception as e:
-            print(f"Error compressing image for report {self.id}: {e}")
+        if new_upload:
+            from .image_jobs import queue_image_job
+
+            queue_image_job(self)
 
     def __str__(self):
         return f"{self.house_number} - {self.status}"
 
 
+# ==============================
+# DAILY ROLLUP (dashboard charts)
+# ==============================
+class ReportDailyStats(models.Model):
+    report_date = models.DateField(null=True, blank=True)
+    # Rows are merged into the NULL violation before a delete (see
+    # merge_violation_stats); SET_NULL could collide with that row
+    violation = models.ForeignKey(
+        "ViolationType", on_delete=models.CASCADE, null=True, related_name="+"
+    )
+    status = models.CharField(max_length=20, choices=PropertyReport.STATUS_CHOICES)
+    report_count = models.IntegerField(default=0)
+    fine_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "Report daily stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report_date", "violation", "status"],
+                name="unique_report_daily_stats",
+                # One row per key even when the date or violation is NULL
+                nulls_distinct=False,
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.report_date} - {self.status} ({self.report_count})"
+
+
 # ==============================
 # REPORT IMAGES (Multiple)
 # ==============================
@@ -169,7 +363,7 @@ class ReportImage(models.Model):
     report = models.ForeignKey(
         "PropertyReport", on_delete=models.CASCADE, related_name="images"
     )
-    image = models.ImageField(upload_to="reports/")
+    image = models.ImageField(upload_to="reports/", storage=report_image_storage)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -179,36 +373,86 @@ class ReportImage(models.Model):
         return f"Image for {self.report.house_number}"
 
     def save(self, *args, **kwargs):
+        new_upload = bool(self.image) and not self.image._committed
+
         super().save(*args, **kwargs)  # Save first
 
-        if self.image:
-            self.compress_image()
-
-    def compress_image(self):
-        """Compress uploaded image to under 1MB."""
-        try:
-            img_path = self.image.path
-            img = Image.open(img_path)
-
-            if img.mode in ("RGBA", "P"):
-                if img.mode == "RGBA":
-                    background = Image.new("RGB", img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])
-                    img = background
-                else:
-                    img = img.convert("RGB")
-
-            img.thumbnail((1280, 1280), Image.Resampling.LANCZOS)
-
-            quality = 85
-            while True:
-                img.save(img_path, format="JPEG", quality=quality, optimize=True)
-                size = os.path.getsize(img_path)
-                if size <= 1024 * 1024 or quality <= 20:
-                    break
-                quality -= 5
-        except Exception as e:
-            print(f"Error compressing image: {e}")
+        if new_upload:
+            from .image_jobs import queue_image_job
+
+            queue_image_job(self)
+
+
+# ==============================
+# IMAGE BLOBS (content-addressed storage)
+# ==============================
+class StoredBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+# ==============================
+# IMAGE PROCESSING QUEUE
+# ==============================
+class ImageJob(models.Model):
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("RUNNING", "Running"),
+        ("DONE", "Done"),
+        ("FAILED", "Failed"),
+    ]
+
+    KIND_CHOICES = [
+        ("ENCODE", "Compress upload"),
+        ("RENDITIONS", "Renditions only"),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey("content_type", "object_id")
+    field_name = models.CharField(max_length=50, default="image")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default="ENCODE")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id} - {self.status}"
+
+
+# ==============================
+# SLOW QUERY LOG
+# ==============================
+class SlowQuery(models.Model):
+    # md5 of the statement with IN lists collapsed (see metrics.fingerprint)
+    fingerprint = models.CharField(max_length=32, db_index=True)
+    sql = models.TextField()
+    # Parameter types and a keyed hash, never the values
+    params = models.TextField(blank=True)
+    # First frame in project code, e.g. "reporting/views.py:171 (dashboard)"
+    origin = models.CharField(max_length=255, blank=True)
+    # Alias the query ran on (the row itself is always on the primary)
+    database = models.CharField(max_length=100, blank=True)
+    duration_ms = models.FloatField()
+    plan = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name_plural = "Slow queries"
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms at {self.origin or 'unknown'}"
 
 
 # ==============================
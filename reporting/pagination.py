@@ -0,0 +1,81 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Q
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str = None
+    prev_cursor: str = None
+
+
+def encode_cursor(report):
+    raw = f"{report.created_at.isoformat()}|{report.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) or None for a malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _seek(queryset, position, forward, descending):
+    """Rows strictly after ``position`` in (created_at, id) order."""
+    created_at, pk = position
+    if forward == descending:
+        return queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    return queryset.filter(
+        Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+    )
+
+
+def keyset_page(queryset, after=None, before=None, page_size=50, descending=True):
+    """Seek pagination on (created_at, id).
+
+    Unlike OFFSET, each page is an index range scan starting at the cursor,
+    so page 1000 costs the same as page 1.
+    """
+    after = decode_cursor(after)
+    before = decode_cursor(before) if not after else None
+    forward = before is None
+
+    if forward == descending:
+        ordering = ("-created_at", "-id")
+    else:
+        ordering = ("created_at", "id")
+
+    rows = queryset.order_by(*ordering)
+    position = after or before
+    if position:
+        rows = _seek(rows, position, forward, descending)
+
+    items = list(rows[: page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    if not forward:
+        items.reverse()
+
+    page = KeysetPage(items=items)
+    if not items:
+        return page
+
+    if forward:
+        page.next_cursor = encode_cursor(items[-1]) if has_more else None
+        page.prev_cursor = encode_cursor(items[0]) if after else None
+    else:
+        page.prev_cursor = encode_cursor(items[0]) if has_more else None
+        page.next_cursor = encode_cursor(items[-1])
+    return page
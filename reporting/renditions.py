@@ -0,0 +1,150 @@
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import features
+
+from .imaging import open_image
+from .storage import is_blob_name
+
+# Bounding boxes in pixels (2x the displayed size for HiDPI screens)
+RENDITIONS = {
+    "thumb": 100,
+    "detail": 1024,
+}
+
+FORMATS = {
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+RENDITION_DIR = "renditions"
+CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# A missing rendition is queued at most once per source in this window
+QUEUE_TIMEOUT = 60 * 10
+
+# Shared by web and worker processes, so renditions stored by a worker are
+# found without re-reading the original
+RENDITION_CACHE_ALIAS = getattr(
+    settings,
+    "RENDITION_CACHE_ALIAS",
+    getattr(settings, "DASHBOARD_CACHE_ALIAS", "default"),
+)
+
+
+def rendition_cache():
+    return caches[RENDITION_CACHE_ALIAS]
+
+
+def available_formats():
+    if features.check("webp"):
+        return ["webp", "jpeg"]
+    return ["jpeg"]
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def rendition_name(digest, spec, fmt):
+    """Content-hashed path, so a changed source never reuses a stale file."""
+    return f"{RENDITION_DIR}/{digest[:2]}/{digest[:32]}_{spec}.{FORMATS[fmt][1]}"
+
+
+def render(data, spec, fmt):
+    img = open_image(data, RENDITIONS[spec])
+    buffer = BytesIO()
+    img.save(buffer, format=FORMATS[fmt][0], quality=80)
+    return buffer.getvalue()
+
+
+def render_all(data):
+    """Every rendition of an image as {(spec, fmt): bytes}; used by workers."""
+    return {
+        (spec, fmt): render(data, spec, fmt)
+        for spec in RENDITIONS
+        for fmt in available_formats()
+    }
+
+
+# ==============================
+# STORAGE
+# ==============================
+def _digest_key(name):
+    return f"rendition:digest:{name}"
+
+
+def _url_key(name):
+    return f"rendition:url:{name}"
+
+
+def _queued_key(name):
+    return f"rendition:queued:{name}"
+
+
+def store_renditions(source_name, data, rendered):
+    """Save pre-rendered files for ``source_name`` (whose bytes are ``data``)."""
+    cache = rendition_cache()
+    digest = content_digest(data)
+    if not is_blob_name(source_name):
+        cache.set(_digest_key(source_name), digest, CACHE_TIMEOUT)
+
+    for (spec, fmt), content in rendered.items():
+        name = rendition_name(digest, spec, fmt)
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(content))
+        cache.set(_url_key(name), default_storage.url(name), CACHE_TIMEOUT)
+
+
+def _source_digest(field_file):
+    """SHA-256 of the source, or None if it hasn't been hashed yet."""
+    if is_blob_name(field_file.name):
+        # Content-addressed: the file name is the SHA-256 of its bytes
+        return os.path.splitext(os.path.basename(field_file.name))[0]
+
+    # Uploaded before content-addressed storage: hashed by the renditions
+    # job (store_renditions) and shared through the cache
+    return rendition_cache().get(_digest_key(field_file.name))
+
+
+def _queue_renditions(field_file):
+    from .image_jobs import queue_renditions
+
+    if rendition_cache().add(_queued_key(field_file.name), 1, QUEUE_TIMEOUT):
+        queue_renditions(field_file.instance, field_file.field.name)
+
+
+def rendition_url(field_file, spec, fmt="jpeg"):
+    """URL of a rendition, or of the original until it has been rendered.
+
+    Missing renditions are rendered by process_image_jobs, not here: list
+    pages would otherwise decode a full-size original per row.
+    """
+    if not field_file:
+        return ""
+    if fmt not in available_formats():
+        fmt = "jpeg"
+
+    digest = _source_digest(field_file)
+    if digest is None:
+        _queue_renditions(field_file)
+        return field_file.url
+
+    name = rendition_name(digest, spec, fmt)
+    cache = rendition_cache()
+    url = cache.get(_url_key(name))
+    if url is not None:
+        return url
+
+    if not default_storage.exists(name):
+        _queue_renditions(field_file)
+        return field_file.url
+
+    url = default_storage.url(name)
+    cache.set(_url_key(name), url, CACHE_TIMEOUT)
+    return url
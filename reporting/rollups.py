@@ -0,0 +1,100 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import PropertyReport, ReportDailyStats
+
+
+# ==============================
+# INCREMENTAL UPDATES
+# ==============================
+def apply_delta(key, count, fines):
+    """Add ``count`` reports and ``fines`` to the rollup row for ``key``."""
+    report_date, violation_id, status = key
+    rows = ReportDailyStats.objects.filter(
+        report_date=report_date, violation_id=violation_id, status=status
+    )
+
+    with transaction.atomic():
+        updated = rows.update(
+            report_count=F("report_count") + count,
+            fine_total=F("fine_total") + fines,
+        )
+        if updated:
+            return
+
+        try:
+            with transaction.atomic():
+                ReportDailyStats.objects.create(
+                    report_date=report_date,
+                    violation_id=violation_id,
+                    status=status,
+                    report_count=count,
+                    fine_total=fines,
+                )
+        except IntegrityError:
+            # Another request created the row first
+            rows.update(
+                report_count=F("report_count") + count,
+                fine_total=F("fine_total") + fines,
+            )
+
+
+def record_report_change(old_state, new_state):
+    """Move a report's contribution from ``old_state`` to ``new_state``.
+
+    Either state may be None (report created or deleted).
+    """
+    if old_state == new_state:
+        return
+
+    with transaction.atomic():
+        if old_state is not None:
+            apply_delta(old_state[:3], -1, -old_state[3])
+        if new_state is not None:
+            apply_delta(new_state[:3], 1, new_state[3])
+
+
+def merge_violation_stats(violation_id):
+    """Move a violation's rollup rows into the matching NULL-violation rows.
+
+    Its reports keep counting once the violation is deleted (their FK is set
+    to NULL); merging first keeps one row per (date, NULL, status).
+    """
+    with transaction.atomic():
+        rows = ReportDailyStats.objects.select_for_update().filter(
+            violation_id=violation_id
+        )
+        for row in rows:
+            apply_delta(
+                (row.report_date, None, row.status), row.report_count, row.fine_total
+            )
+        rows.delete()
+
+
+# ==============================
+# FULL REBUILD
+# ==============================
+def rebuild_daily_stats(batch_size=1000):
+    """Recompute ReportDailyStats from PropertyReport. Returns the row count."""
+    grouped = (
+        PropertyReport.objects.order_by()
+        .values("report_date", "violation_id", "status")
+        .annotate(report_count=Count("id"), fine_total=Sum("fine_amount"))
+    )
+
+    rows = [
+        ReportDailyStats(
+            report_date=entry["report_date"],
+            violation_id=entry["violation_id"],
+            status=entry["status"],
+            report_count=entry["report_count"],
+            fine_total=entry["fine_total"] or 0,
+        )
+        for entry in grouped.iterator()
+    ]
+
+    with transaction.atomic():
+        ReportDailyStats.objects.all().delete()
+        ReportDailyStats.objects.bulk_create(rows, batch_size=batch_size)
+
+    return len(rows)
@@ -0,0 +1,53 @@
+import uuid
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+
+# Must match the configuration used by the search triggers (migration 0016)
+SEARCH_CONFIG = "english"
+MAX_QUERY_LENGTH = 200
+
+# Best match first, then the most similar house number, then newest
+RANK_ORDERING = ("-rank", "-similarity", "-created_at")
+
+
+def _search_query(query):
+    # websearch syntax: "dog barking" -gate, quoted phrases, OR
+    return SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def match_reports(reports, query):
+    """Reports matching ``query`` in their text or by a similar house number.
+
+    Both branches are index-backed (GIN on search_vector, trigram GIN on
+    house_number); a full report UUID matches exactly.
+    """
+    query = (query or "").strip()[:MAX_QUERY_LENGTH]
+    if not query:
+        return reports
+    try:
+        return reports.filter(report_id=uuid.UUID(query))
+    except ValueError:
+        pass
+    return reports.filter(
+        Q(search_vector=_search_query(query)) | Q(house_number__trigram_similar=query)
+    )
+
+
+def rank_reports(reports, query):
+    """Annotate ``rank`` and ``similarity`` for ``query`` and order best first.
+
+    Expects ``reports`` to be filtered with ``match_reports`` already.
+    """
+    query = (query or "").strip()[:MAX_QUERY_LENGTH]
+    if not query:
+        return reports
+    return reports.annotate(
+        rank=SearchRank(F("search_vector"), _search_query(query)),
+        similarity=TrigramSimilarity("house_number", query),
+    ).order_by(*RANK_ORDERING)
+
+
+def search_reports(reports, query):
+    """Ranked search: matching reports, best first."""
+    return rank_reports(match_reports(reports, query), query)
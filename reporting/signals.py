@@ -0,0 +1,159 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Stand
+from . import cache, db_router, metrics, tiles
+from .blobs import release_reference, replace_reference
+from .models import PropertyReport, ReportImage, ViolationType
+from .rollups import merge_violation_stats, record_report_change
+from .slow_queries import install as install_slow_query_logger
+
+
+def _remember_stored(instance, position=True, image=False):
+    """Stash the row's stored lon/lat and/or image name before a save.
+
+    The old position lets its tile be invalidated; the old image name lets
+    its blob reference be released.
+    """
+    fields = (["longitude", "latitude"] if position else []) + (
+        ["image"] if image else []
+    )
+    stored = None
+    if instance.pk:
+        stored = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+
+    if position:
+        instance._tile_position = stored and (stored["longitude"], stored["latitude"])
+    if image:
+        instance._stored_image = stored["image"] if stored else None
+
+
+def _update_image_reference(instance):
+    new_name = instance.image.name or None
+    replace_reference(getattr(instance, "_stored_image", None), new_name)
+    instance._stored_image = new_name
+
+
+def _invalidate_tiles(layer, instance):
+    """Drop the tiles at the new and old position once the save commits.
+
+    Deleting earlier would let a render running meanwhile read the old row
+    and write the stale tile back, where it would stay until the next
+    layer change.
+    """
+    points = [(instance.longitude, instance.latitude)]
+    old_position = getattr(instance, "_tile_position", None)
+    if old_position:
+        points.append(old_position)
+
+    def invalidate():
+        for lon, lat in points:
+            tiles.invalidate_point(layer, lon, lat)
+
+    transaction.on_commit(invalidate)
+
+
+def _bump_dates_on_commit(dates):
+    """Bump the dashboard versions once the change is visible to readers.
+
+    Bumped earlier, a dashboard computed before the commit would be stored
+    under the new version and served until the next change.
+    """
+    transaction.on_commit(lambda: cache.bump_dates(dates))
+
+
+# ==============================
+# PROPERTY REPORT
+# ==============================
+@receiver(pre_save, sender=PropertyReport)
+def report_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_stored(instance, image=True)
+
+
+@receiver(post_save, sender=PropertyReport)
+def report_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = getattr(instance, "_rollup_state", None)
+    new_state = instance.rollup_state()
+
+    record_report_change(old_state, new_state)
+    _bump_dates_on_commit({state[0] for state in (old_state, new_state) if state})
+    _invalidate_tiles("reports", instance)
+    _update_image_reference(instance)
+
+    instance._rollup_state = new_state
+
+
+@receiver(post_delete, sender=PropertyReport)
+def report_deleted(sender, instance, **kwargs):
+    old_state = getattr(instance, "_rollup_state", None) or instance.rollup_state()
+
+    record_report_change(old_state, None)
+    _bump_dates_on_commit({old_state[0]})
+    _invalidate_tiles("reports", instance)
+    release_reference(instance.image.name)
+
+
+# ==============================
+# REPORT IMAGE (blob references)
+# ==============================
+@receiver(pre_save, sender=ReportImage)
+def report_image_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_stored(instance, position=False, image=True)
+
+
+@receiver(post_save, sender=ReportImage)
+def report_image_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _update_image_reference(instance)
+
+
+@receiver(post_delete, sender=ReportImage)
+def report_image_deleted(sender, instance, **kwargs):
+    release_reference(instance.image.name)
+
+
+# ==============================
+# VIOLATION TYPE
+# ==============================
+@receiver(pre_delete, sender=ViolationType)
+def violation_deleting(sender, instance, **kwargs):
+    merge_violation_stats(instance.pk)
+
+
+@receiver(post_save, sender=ViolationType)
+@receiver(post_delete, sender=ViolationType)
+def violation_changed(sender, instance, **kwargs):
+    transaction.on_commit(cache.bump_all)
+    transaction.on_commit(lambda: tiles.bump_layer("reports"))
+
+
+# ==============================
+# STAND (vector tiles)
+# ==============================
+@receiver(pre_save, sender=Stand)
+def stand_saving(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _remember_stored(instance)
+
+
+@receiver(post_save, sender=Stand)
+@receiver(post_delete, sender=Stand)
+def stand_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _invalidate_tiles("stands", instance)
+
+
+# ==============================
+# QUERY WRAPPERS
+# ==============================
+connection_created.connect(
+    install_slow_query_logger, dispatch_uid="reporting_slow_query_logger"
+)
+connection_created.connect(metrics.install, dispatch_uid="reporting_request_metrics")
+connection_created.connect(db_router.install, dispatch_uid="reporting_replica_fallback")
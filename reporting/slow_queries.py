@@ -0,0 +1,176 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.crypto import salted_hmac
+
+from .metrics import fingerprint
+
+# Queries at least this slow are logged; 0 turns the log off
+SLOW_QUERY_MS = getattr(settings, "SLOW_QUERY_MS", 500)
+
+# Rows kept in SlowQuery; older ones are trimmed as new ones arrive
+SLOW_QUERY_LOG_SIZE = getattr(settings, "SLOW_QUERY_LOG_SIZE", 5000)
+
+# EXPLAIN ANALYZE re-runs the query, so each statement shape is explained
+# at most once per interval per process
+SLOW_QUERY_EXPLAIN = getattr(settings, "SLOW_QUERY_EXPLAIN", True)
+EXPLAIN_INTERVAL = 15 * 60
+
+# Statements EXPLAIN ANALYZE must not re-run: writes, row locks, SELECT INTO
+# and sequence changes
+_UNSAFE_TO_ANALYZE_RE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|INTO|SHARE|NEXTVAL|SETVAL)\b", re.IGNORECASE
+)
+
+_state = threading.local()
+_explained = {}
+
+_PROJECT_ROOT = str(settings.BASE_DIR) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def query_origin():
+    """The innermost stack frame in project code, as "path:line (function)"."""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith("<"):
+            continue
+        filename = os.path.abspath(frame.filename)
+        if (
+            filename.startswith(_PROJECT_ROOT)
+            and filename != _THIS_FILE
+            and "site-packages" not in filename
+        ):
+            path = os.path.relpath(filename, _PROJECT_ROOT)
+            return f"{path}:{frame.lineno} ({frame.name})"[:255]
+    return ""
+
+
+def explain(connection, sql, params):
+    """``EXPLAIN (ANALYZE, BUFFERS)`` text for a statement on PostgreSQL.
+
+    Runs on the raw driver cursor so it isn't counted or logged again, inside
+    a savepoint when a transaction is open so a failure can't break it.
+    """
+    in_transaction = not connection.get_autocommit()
+    with connection.connection.cursor() as cursor:
+        if in_transaction:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            if in_transaction:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return f"EXPLAIN failed: {e}"
+        if in_transaction:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    return plan
+
+
+def _should_explain(connection, sql, digest):
+    if not SLOW_QUERY_EXPLAIN or connection.vendor != "postgresql":
+        return False
+    # ANALYZE executes the statement: plain reads only (no CTEs, which may
+    # contain writes)
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return False
+    if _UNSAFE_TO_ANALYZE_RE.search(sql):
+        return False
+    now = time.monotonic()
+    if now - _explained.get(digest, -EXPLAIN_INTERVAL) < EXPLAIN_INTERVAL:
+        return False
+    _explained[digest] = now
+    return True
+
+
+def params_summary(params):
+    """Types of the parameters plus a keyed hash of their values.
+
+    Values themselves are never stored: statements on sessions or users
+    would put session data and password hashes in the admin. The hash
+    still shows whether slow runs share the same arguments.
+    """
+    if params is None:
+        return ""
+    if isinstance(params, dict):
+        shape = ", ".join(
+            f"{key}: {type(value).__name__}" for key, value in params.items()
+        )
+    else:
+        shape = ", ".join(type(value).__name__ for value in params)
+    digest = salted_hmac("reporting.slow_queries", repr(params)).hexdigest()[:12]
+    return f"[{shape}] #{digest}"[:2000]
+
+
+def log_slow_query(connection, sql, params, seconds):
+    from .models import SlowQuery
+
+    digest = hashlib.md5(fingerprint(sql).encode()).hexdigest()
+    plan = (
+        explain(connection, sql, params)
+        if _should_explain(connection, sql, digest)
+        else ""
+    )
+
+    # Always on the primary: replicas are read-only
+    entry = SlowQuery.objects.using(DEFAULT_DB_ALIAS).create(
+        fingerprint=digest,
+        sql=sql,
+        params=params_summary(params),
+        origin=query_origin(),
+        database=connection.alias,
+        duration_ms=seconds * 1000,
+        plan=plan,
+    )
+    # Keep the table bounded
+    SlowQuery.objects.using(DEFAULT_DB_ALIAS).filter(
+        pk__lte=entry.pk - SLOW_QUERY_LOG_SIZE
+    ).delete()
+
+
+class SlowQueryLogger:
+    """Execute wrapper that logs queries slower than SLOW_QUERY_MS.
+
+    The plan is taken on the query's own connection; the log row goes to
+    the primary, inside the caller's transaction when the query ran there
+    (so it is lost if that transaction rolls back).
+    """
+
+    def __call__(self, execute, sql, params, many, context):
+        # The logger's own queries go straight through
+        if getattr(_state, "active", False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = time.perf_counter() - start
+
+        if not many and elapsed * 1000 >= SLOW_QUERY_MS:
+            _state.active = True
+            connection = context["connection"]
+            try:
+                # A savepoint, so a failed insert can't poison the caller's
+                # transaction
+                with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                    log_slow_query(connection, sql, params, elapsed)
+            except Exception:
+                # Logging must never break the query that triggered it
+                pass
+            finally:
+                _state.active = False
+        return result
+
+
+slow_query_logger = SlowQueryLogger()
+
+
+def install(connection, **kwargs):
+    """connection_created receiver: wrap every new connection."""
+    if SLOW_QUERY_MS and slow_query_logger not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_logger)
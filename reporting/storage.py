@@ -0,0 +1,89 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+# reports/ab/cd/<sha256>.<ext>
+BLOB_NAME_RE = re.compile(r"^(?P<prefix>.+)/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that names files by the SHA-256 of their content.
+
+    Identical uploads map to the same file, which is written only once, and
+    files are spread over a two-level ``ab/cd/`` directory tree instead of a
+    single flat folder. Files are never overwritten or renamed; which ones are
+    still referenced is tracked by StoredBlob and cleaned up by
+    ``gc_report_images``.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content, see _save()
+        return name
+
+    def blob_name(self, name, digest):
+        # Re-saving a blob (e.g. its encoded JPEG) must not nest its shards
+        match = BLOB_NAME_RE.match(name)
+        prefix = match["prefix"] if match else os.path.dirname(name) or "blobs"
+        ext = os.path.splitext(name)[1].lower() or ".bin"
+        return f"{prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def _save(self, name, content):
+        tmp_dir = self.path(".tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        # Hash while writing to a temp file so the upload is read only once
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            final_name = self.blob_name(name, digest.hexdigest())
+            final_path = self.path(final_name)
+
+            try:
+                # Duplicate upload: keep the existing blob, and mark it as
+                # fresh so gc_report_images gives it a new grace period
+                os.utime(final_path)
+            except FileNotFoundError:
+                pass
+            else:
+                os.remove(tmp_path)
+                return final_name
+
+            directory = os.path.dirname(final_path)
+            if self.directory_permissions_mode is not None:
+                old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+                try:
+                    os.makedirs(
+                        directory, self.directory_permissions_mode, exist_ok=True
+                    )
+                finally:
+                    os.umask(old_umask)
+            else:
+                os.makedirs(directory, exist_ok=True)
+
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return final_name
+
+
+def is_blob_name(name):
+    return bool(name) and bool(BLOB_NAME_RE.match(name))
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def report_image_storage():
+    return content_addressed_storage
@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+import shapely
+from django.db import connection, transaction
+
+from .models import PropertyReport
+
+# Share of each status in generated data
+STATUS_WEIGHTS = {
+    "OPEN": 0.3,
+    "IN_PROGRESS": 0.2,
+    "RESOLVED": 0.4,
+    "APPROVED": 0.1,
+}
+
+# Arlington Estate boundary
+ESTATE_BOUNDARY = {
+    "type": "MultiPolygon",
+    "coordinates": [
+        [
+            [
+                [31.072844583999419, -17.900947122786324],
+                [31.077399827519841, -17.898723730115641],
+                [31.078213263862775, -17.902194391845487],
+                [31.081955071040266, -17.901109810054912],
+                [31.081250092876388, -17.897639148325066],
+                [31.085317274591052, -17.897096857429776],
+                [31.088462561783725, -17.902194391845487],
+                [31.0895471435743, -17.903875493620884],
+                [31.079352074742879, -17.911087962528217],
+                [31.076749078445495, -17.906749635365912],
+                [31.072844583999419, -17.900947122786324],
+            ]
+        ]
+    ],
+}
+
+# bulk_create skips save(): fill in created_at and the indexed point in SQL
+FINALIZE_SQL = """
+    UPDATE {table}
+    SET created_at = report_date + random() * interval '1 day',
+        location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+    WHERE id = ANY(%s)
+"""
+
+
+# ==============================
+# SAMPLING
+# ==============================
+def sample_points(polygon, n, rng):
+    """``n`` uniform random (lon, lat) points inside ``polygon``, as arrays.
+
+    Rejection-samples whole batches from the bounding box, sized from the
+    polygon's share of the box, with a vectorized containment test.
+    """
+    shapely.prepare(polygon)
+    minx, miny, maxx, maxy = polygon.bounds
+    hit_rate = max(polygon.area / ((maxx - minx) * (maxy - miny)), 0.01)
+
+    xs, ys, found = [], [], 0
+    while found < n:
+        size = math.ceil((n - found) / hit_rate * 1.1) + 16
+        x = rng.uniform(minx, maxx, size)
+        y = rng.uniform(miny, maxy, size)
+        inside = shapely.contains_xy(polygon, x, y)
+        xs.append(x[inside])
+        ys.append(y[inside])
+        found += int(inside.sum())
+
+    return np.concatenate(xs)[:n], np.concatenate(ys)[:n]
+
+
+def date_distribution(start, end, year_weights=None, seasonal=0.0, peak_month=1):
+    """Days between ``start`` and ``end`` and the probability of each.
+
+    ``year_weights`` maps a year to a relative weight (default 1);
+    ``seasonal`` is the amplitude of a yearly cosine peaking in
+    ``peak_month`` (0 = flat, 1 = nothing at the opposite month).
+    """
+    days = np.arange(
+        np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]"
+    )
+    years = days.astype("datetime64[Y]").astype(int) + 1970
+    months = days.astype("datetime64[M]").astype(int) % 12 + 1
+
+    weights = np.ones(len(days))
+    for year, weight in (year_weights or {}).items():
+        weights[years == year] = weight
+    weights *= 1 + seasonal * np.cos(2 * np.pi * (months - peak_month) / 12)
+
+    return days, weights / weights.sum()
+
+
+# ==============================
+# GENERATION
+# ==============================
+class ReportGenerator:
+    """Generate synthetic PropertyReports in vectorized chunks."""
+
+    def __init__(self, polygon, violations, user, days, day_weights, seed=None):
+        self.polygon = polygon
+        self.user = user
+        self.rng = np.random.default_rng(seed)
+
+        self.violation_ids = [v.pk for v in violations]
+        self.violation_fines = [v.fine_amount for v in violations]
+        self.days = days
+        self.day_weights = day_weights
+        self.statuses = np.array(list(STATUS_WEIGHTS))
+        self.status_weights = np.array(list(STATUS_WEIGHTS.values()))
+
+    def build(self, n, offset=0):
+        """``n`` unsaved reports; every random column is drawn as one array."""
+        rng = self.rng
+        lons, lats = sample_points(self.polygon, n, rng)
+        lons, lats = np.round(lons, 6), np.round(lats, 6)
+        dates = rng.choice(self.days, n, p=self.day_weights)
+        violations = rng.integers(len(self.violation_ids), size=n)
+        statuses = rng.choice(self.statuses, n, p=self.status_weights)
+        houses = rng.integers(1, 151, size=n)
+
+        # tolist() turns the columns into plain Python ints/strs/dates at C speed
+        return [
+            PropertyReport(
+                reported_by=self.user,
+                house_number=f"H-{house}",
+                violation_id=self.violation_ids[v],
+                description=f"Dummy report {offset + i + 1}",
+                fine_amount=self.violation_fines[v],
+                status=status,
+                latitude=lat,
+                longitude=lon,
+                report_date=report_date,
+            )
+            for i, (house, v, status, lat, lon, report_date) in enumerate(
+                zip(
+                    houses.tolist(),
+                    violations.tolist(),
+                    statuses.tolist(),
+                    lats.tolist(),
+                    lons.tolist(),
+                    dates.tolist(),
+                )
+            )
+        ]
+
+    def insert(self, reports):
+        """Bulk insert one chunk, then backfill what save() would have set."""
+        with transaction.atomic():
+            created = PropertyReport.objects.bulk_create(reports)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    FINALIZE_SQL.format(table=PropertyReport._meta.db_table),
+                    [[report.pk for report in created]],
+                )
+        return len(created)
+
+    def generate(self, count, chunk_size=10000, progress=None):
+        created = 0
+        while created < count:
+            n = min(chunk_size, count - created)
+            created += self.insert(self.build(n, offset=created))
+            if progress:
+                progress(created)
+        return created
@@ -0,0 +1,36 @@
+from django import template
+from django.utils.html import format_html
+
+from reporting.renditions import available_formats, rendition_url as _rendition_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def rendition_url(image, spec, fmt="jpeg"):
+    """{% rendition_url report.image "thumb" "webp" %}"""
+    return _rendition_url(image, spec, fmt)
+
+
+@register.simple_tag
+def rendition_picture(image, spec, alt="", css_class="", width=None, style=""):
+    """<picture> with a WebP source and a JPEG fallback."""
+    if not image:
+        return ""
+
+    img = format_html(
+        '<img src="{}" alt="{}" class="{}"{}{} loading="lazy">',
+        _rendition_url(image, spec, "jpeg"),
+        alt,
+        css_class,
+        format_html(' width="{}"', width) if width else "",
+        format_html(' style="{}"', style) if style else "",
+    )
+    if "webp" not in available_formats():
+        return img
+
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp">{}</picture>',
+        _rendition_url(image, spec, "webp"),
+        img,
+    )
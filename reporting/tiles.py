@@ -0,0 +1,168 @@
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+from accounts.models import Stand
+from . import cache
+from .models import PropertyReport, ViolationType
+
+TILE_CACHE_DIR = Path(
+    getattr(settings, "TILE_CACHE_DIR", settings.BASE_DIR / "cache" / "tiles")
+)
+
+# Only tiles inside this zoom range are written to the cache
+TILE_CACHE_MIN_ZOOM = getattr(settings, "TILE_CACHE_MIN_ZOOM", 10)
+TILE_CACHE_MAX_ZOOM = getattr(settings, "TILE_CACHE_MAX_ZOOM", 20)
+
+MAX_ZOOM = 22
+
+
+# ==============================
+# LAYERS
+# ==============================
+# Each query receives z, x, y (for ST_TileEnvelope) followed by the tile's
+# lon/lat bounds, and returns a single bytea column.
+REPORTS_SQL = """
+    WITH bounds AS (SELECT ST_TileEnvelope(%s, %s, %s) AS geom),
+    features AS (
+        SELECT
+            ST_AsMVTGeom(ST_Transform(r.location, 3857), bounds.geom) AS geom,
+            r.report_id::text AS id,
+            r.house_number AS house,
+            r.status AS status,
+            v.name AS violation
+        FROM {reports} r
+        LEFT JOIN {violations} v ON v.id = r.violation_id, bounds
+        WHERE r.location && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
+    )
+    SELECT ST_AsMVT(features.*, 'reports') FROM features
+""".format(
+    reports=PropertyReport._meta.db_table,
+    violations=ViolationType._meta.db_table,
+)
+
+STANDS_SQL = """
+    WITH bounds AS (SELECT ST_TileEnvelope(%s, %s, %s) AS geom),
+    features AS (
+        SELECT
+            ST_AsMVTGeom(ST_Transform(s.location, 3857), bounds.geom) AS geom,
+            s.stand_numb AS stand,
+            s.street AS street,
+            s.dev_status AS developed
+        FROM {stands} s, bounds
+        WHERE s.location && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
+    )
+    SELECT ST_AsMVT(features.*, 'stands') FROM features
+""".format(stands=Stand._meta.db_table)
+
+LAYERS = {
+    "reports": REPORTS_SQL,
+    "stands": STANDS_SQL,
+}
+
+
+# ==============================
+# TILE MATH
+# ==============================
+def is_valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+def tile_for_point(lon, lat, z):
+    """Web-mercator tile (x, y) containing a lon/lat point."""
+    n = 2**z
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(z, x, y):
+    """Return (min_lon, min_lat, max_lon, max_lat) of a tile."""
+    n = 2**z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+# ==============================
+# RENDERING + CACHE
+# ==============================
+def layer_version(layer):
+    return cache.get_version(f"tiles:version:{layer}")
+
+
+def bump_layer(layer):
+    """Invalidate every cached tile of a layer (after bulk imports)."""
+    cache.bump(f"tiles:version:{layer}")
+
+
+def _tile_path(layer, z, x, y, version=None):
+    if version is None:
+        version = layer_version(layer)
+    return TILE_CACHE_DIR / layer / str(version) / str(z) / str(x) / f"{y}.pbf"
+
+
+def render_tile(layer, z, x, y):
+    params = [z, x, y, *tile_bounds(z, x, y)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(LAYERS[layer], params)
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] else b""
+
+
+def get_tile(layer, z, x, y):
+    """Return tile bytes, using the filesystem cache inside the cached zooms."""
+    if not TILE_CACHE_MIN_ZOOM <= z <= TILE_CACHE_MAX_ZOOM:
+        return render_tile(layer, z, x, y)
+
+    path = _tile_path(layer, z, x, y)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+
+    data = render_tile(layer, z, x, y)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+    with os.fdopen(fd, "wb") as tmp:
+        tmp.write(data)
+    os.replace(tmp_path, path)
+    return data
+
+
+def invalidate_point(layer, lon, lat):
+    """Drop the cached tiles that contain a point, at every cached zoom."""
+    if lon is None or lat is None:
+        return
+    version = layer_version(layer)
+    for z in range(TILE_CACHE_MIN_ZOOM, TILE_CACHE_MAX_ZOOM + 1):
+        x, y = tile_for_point(float(lon), float(lat), z)
+        try:
+            _tile_path(layer, z, x, y, version).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def clear_stale_versions():
+    """Remove tile directories left behind by earlier layer versions."""
+    removed = 0
+    for layer in LAYERS:
+        layer_dir = TILE_CACHE_DIR / layer
+        if not layer_dir.is_dir():
+            continue
+        current = str(layer_version(layer))
+        for version_dir in layer_dir.iterdir():
+            if version_dir.name != current:
+                shutil.rmtree(version_dir, ignore_errors=True)
+                removed += 1
+    return removed
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 from reporting import views as reporting_views
 
 urlpatterns = [
@@ -8,7 +8,39 @@ urlpatterns = [
     path("report/create/", views.create_report, name="create_report"),
     path("dashboard/", views.resident_dashboard, name="resident_dashboard"),
     path("main-dashboard/", views.dashboard, name="dashboard"),
+    path(
+        "superuser-dashboard/",
+        views.superuser_dashboard,
+        name="superuser_dashboard",
+    ),
     path("login/", views.login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
     path("reports-map/", views.reports_map, name="reports_map"),
+    path("api/reports.geojson", views.reports_geojson, name="reports_geojson"),
+    path("export/reports.<str:fmt>", views.export_reports, name="export_reports"),
+    path("metrics/", views.request_metrics, name="request_metrics"),
+    path("metrics/prometheus", views.prometheus_metrics, name="prometheus_metrics"),
+    path(
+        "tiles/<str:layer>/<int:z>/<int:x>/<int:y>.pbf",
+        views.vector_tile,
+        name="vector_tile",
+    ),
+    # Async versions of the read-heavy pages, for ASGI deployments
+    path("async/", async_views.report_list, name="async_report_list"),
+    path(
+        "async/report/<uuid:report_id>/",
+        async_views.report_detail,
+        name="async_report_detail",
+    ),
+    path("async/main-dashboard/", async_views.dashboard, name="async_dashboard"),
+    path(
+        "async/superuser-dashboard/",
+        async_views.superuser_dashboard,
+        name="async_superuser_dashboard",
+    ),
+    path(
+        "async/api/reports.geojson",
+        async_views.reports_geojson,
+        name="async_reports_geojson",
+    ),
 ]
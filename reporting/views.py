@@ -1,16 +1,101 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from .models import PropertyReport
+from .models import PropertyReport, ViolationType
 from .forms import PropertyReportForm
+from .filters import filter_reports, parse_report_filters
+from .pagination import KeysetPage, keyset_page
+from .search import rank_reports
+from . import exports
+from .db_router import reads_from_replica
+
+REPORT_LIST_PAGE_SIZE = 50
+
+# Columns rendered by report_list.html
+REPORT_LIST_FIELDS = (
+    "report_id",
+    "house_number",
+    "status",
+    "fine_amount",
+    "created_at",
+    "image",
+    "violation__name",
+    "violation__fine_amount",
+    "reported_by__username",
+)
 
 
 # -----------------------------
 # List all reports (admin or general view)
 # -----------------------------
+def _report_list_sort(params, filters):
+    sort = params.get("sort")
+    if sort not in ("oldest", "relevance") or (
+        sort == "relevance" and not filters["q"]
+    ):
+        sort = "newest"
+    return sort
+
+
+def _report_list_page(params, filters, sort):
+    reports = filter_reports(
+        PropertyReport.objects.select_related("violation", "reported_by").only(
+            *REPORT_LIST_FIELDS
+        ),
+        filters,
+    )
+
+    if sort == "relevance":
+        # Ranked results can't be keyset-paginated; show the best matches
+        return KeysetPage(
+            items=list(rank_reports(reports, filters["q"])[:REPORT_LIST_PAGE_SIZE])
+        )
+    return keyset_page(
+        reports,
+        after=params.get("after"),
+        before=params.get("before"),
+        page_size=REPORT_LIST_PAGE_SIZE,
+        descending=sort == "newest",
+    )
+
+
+def _report_list_export_formats(user):
+    return exports.available_formats() if exports.can_export(user) else []
+
+
+def _report_list_context(params, filters, sort, page, violations, export_formats):
+    # Querystring without the cursor, for the pager links
+    params = params.copy()
+    params.pop("after", None)
+    params.pop("before", None)
+
+    return {
+        "reports": page.items,
+        "page": page,
+        "filters": filters,
+        "sort": sort,
+        "query_string": params.urlencode(),
+        "status_choices": PropertyReport.STATUS_CHOICES,
+        "violations": violations,
+        "export_formats": export_formats,
+    }
+
+
 @login_required
+@reads_from_replica
 def report_list(request):
-    reports = PropertyReport.objects.all().order_by("-created_at")
-    return render(request, "reporting/report_list.html", {"reports": reports})
+    filters = parse_report_filters(request.GET)
+    sort = _report_list_sort(request.GET, filters)
+    page = _report_list_page(request.GET, filters, sort)
+
+    context = _report_list_context(
+        request.GET,
+        filters,
+        sort,
+        page,
+        ViolationType.objects.only("id", "name"),
+        _report_list_export_formats(request.user),
+    )
+    return render(request, "reporting/report_list.html", context)
 
 
 # -----------------------------
@@ -65,67 +150,67 @@ def resident_dashboard(request):
 
 
 from datetime import datetime
-from django.db.models import Count, Sum
-from django.db.models.functions import TruncMonth
 from django.shortcuts import render
 from reporting.models import PropertyReport
+from reporting.aggregates import rollup_stats
+from reporting.cache import cached_dashboard
 
 
-@login_required
-def dashboard(request):
-    current_year = datetime.now().year
-
-    selected_year = int(request.GET.get("year", current_year))
-    selected_month = request.GET.get("month")
-
-    reports = PropertyReport.objects.filter(report_date__year=selected_year)
-
-    # 🔹 Filter by month if provided
-    if selected_month:
-        selected_month = int(selected_month)
-        reports = reports.filter(report_date__month=selected_month)
-
+def _dashboard_stats_context(selected_year, selected_month):
+    """Cacheable part of the dashboard context (numbers and chart data)."""
     # ==========================
-    # SUMMARY
+    # SUMMARY + CHARTS (read from the daily rollup)
     # ==========================
-    total_reports = reports.count()
-    pending_reports = reports.filter(status="OPEN").count()
-    resolved_reports = reports.filter(status="RESOLVED").count()
-    total_fines = reports.aggregate(total=Sum("fine_amount"))["total"] or 0
+    stats = rollup_stats(
+        year=selected_year, month=selected_month, monthly=not selected_month
+    )
+    return _dashboard_chart_context(stats, selected_year, selected_month)
 
+
+def _dashboard_chart_context(stats, selected_year, selected_month):
     # ==========================
     # MONTHLY BAR CHART (Full year only)
     # ==========================
-    months = []
-    counts = []
-
     if not selected_month:
-        monthly_data = (
-            PropertyReport.objects.filter(report_date__year=selected_year)
-            .annotate(month=TruncMonth("report_date"))
-            .values("month")
-            .annotate(count=Count("id"))
-        )
-
-        counts_dict = {entry["month"].month: entry["count"] for entry in monthly_data}
-
-        for m in range(1, 13):
-            months.append(datetime(selected_year, m, 1).strftime("%b"))
-            counts.append(counts_dict.get(m, 0))
+        months = [datetime(selected_year, m, 1).strftime("%b") for m in range(1, 13)]
+        counts = stats.monthly_counts
     else:
         months = ["Selected Month"]
-        counts = [total_reports]
+        counts = [stats.total_reports]
 
     # ==========================
     # PIE CHART
     # ==========================
-    violation_data = (
-        reports.values("violation__name").annotate(count=Count("id")).order_by("-count")
-    )
+    violation_labels = [v.name for v in stats.violations]
+    violation_counts = [v.count for v in stats.violations]
+
+    return {
+        "total_reports": stats.total_reports,
+        "pending_reports": stats.open_reports,
+        "resolved_reports": stats.resolved_reports,
+        "total_fines": stats.total_fines,
+        "months": months,
+        "counts": counts,
+        "violation_labels": violation_labels,
+        "violation_counts": violation_counts,
+    }
 
-    violation_labels = [v["violation__name"] for v in violation_data]
-    violation_counts = [v["count"] for v in violation_data]
 
+def _dashboard_period(request):
+    """(current year, selected year, selected month or None) from the query."""
+    current_year = datetime.now().year
+
+    selected_year = int(request.GET.get("year", current_year))
+    selected_month = request.GET.get("month")
+
+    # 🔹 Filter by month if provided
+    if selected_month:
+        selected_month = int(selected_month)
+
+    return current_year, selected_year, selected_month
+
+
+def _dashboard_filter_context(current_year, selected_year, selected_month):
     years_list = list(range(2020, current_year + 1))
     months_list = [
         (1, "January"),
@@ -142,23 +227,30 @@ def dashboard(request):
         (12, "December"),
     ]
 
-    context = {
-        "total_reports": total_reports,
-        "pending_reports": pending_reports,
-        "resolved_reports": resolved_reports,
-        "total_fines": total_fines,
-        "months": months,
-        "counts": counts,
-        "violation_labels": violation_labels,
-        "violation_counts": violation_counts,
+    return {
         "selected_year": selected_year,
         "selected_month": selected_month,
         "years_list": years_list,
         "months_list": months_list,
-        # add mal
-        "map_reports": reports.exclude(latitude__isnull=True, longitude__isnull=True),
     }
 
+
+@login_required
+def dashboard(request):
+    current_year, selected_year, selected_month = _dashboard_period(request)
+
+    context = dict(
+        cached_dashboard(
+            "manager",
+            selected_year,
+            selected_month,
+            lambda: _dashboard_stats_context(selected_year, selected_month),
+        )
+    )
+    context.update(
+        _dashboard_filter_context(current_year, selected_year, selected_month)
+    )
+
     return render(request, "reporting/summary-dashboard.html", context)
 
 
@@ -197,62 +289,181 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from reporting.models import PropertyReport, ViolationType, Community, Profile
 from django.contrib.auth.models import User
-from django.db.models import Count, Sum
 
+SUPERUSER_TOP_VIOLATIONS = 5
 
-@login_required
-def superuser_dashboard(request):
-    # Only superusers can access this page
-    if not request.user.is_superuser:
-        return redirect("dashboard")
 
+def _superuser_stats_context():
     # =========================
     # Summary stats
     # =========================
-    total_reports = PropertyReport.objects.count()
-    total_users = User.objects.count()
-    total_communities = Community.objects.count()
-    total_violations = ViolationType.objects.count()
-    total_fines = (
-        PropertyReport.objects.aggregate(total=Sum("fine_amount"))["total"] or 0
-    )
-    open_reports = PropertyReport.objects.filter(status="OPEN").count()
-    resolved_reports = PropertyReport.objects.filter(status="RESOLVED").count()
+    stats = rollup_stats(monthly=False, top_violations=SUPERUSER_TOP_VIOLATIONS)
 
-    # =========================
-    # Top Violations
-    # =========================
-    top_violations = (
-        PropertyReport.objects.values("violation__name")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:5]
+    return _superuser_context(
+        stats,
+        User.objects.count(),
+        Community.objects.count(),
+        ViolationType.objects.count(),
     )
 
-    context = {
-        "total_reports": total_reports,
+
+def _superuser_context(stats, total_users, total_communities, total_violations):
+    return {
+        "total_reports": stats.total_reports,
         "total_users": total_users,
         "total_communities": total_communities,
         "total_violations": total_violations,
-        "total_fines": total_fines,
-        "open_reports": open_reports,
-        "resolved_reports": resolved_reports,
-        "top_violations": top_violations,
+        "total_fines": stats.total_fines,
+        "open_reports": stats.open_reports,
+        "resolved_reports": stats.resolved_reports,
+        # =========================
+        # Top Violations
+        # =========================
+        "top_violations": stats.violations,
     }
 
+
+@login_required
+def superuser_dashboard(request):
+    # Only superusers can access this page
+    if not request.user.is_superuser:
+        return redirect("dashboard")
+
+    context = cached_dashboard("superuser", None, None, _superuser_stats_context)
+
     return render(request, "reporting/superuser_dashboard.html", context)
 
 
 # ---------------- CREATE MAP----------------
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseNotModified, StreamingHttpResponse
 from .models import PropertyReport
+from .filters import filter_reports, parse_report_filters, parse_zoom
+from .geojson import FEATURE_FIELDS, iter_feature_collection, reports_etag
+from .clustering import iter_cluster_collection, should_cluster
 
 
 @login_required
 def reports_map(request):
-    reports = PropertyReport.objects.exclude(
-        latitude__isnull=True, longitude__isnull=True
+    return render(request, "reporting/reports_map.html")
+
+
+@login_required
+def reports_geojson(request):
+    """Report markers as a streamed GeoJSON FeatureCollection.
+
+    With ``zoom`` below the clustering threshold, reports are aggregated
+    into grid cells server-side instead of being sent one by one.
+    """
+    filters = parse_report_filters(request.GET)
+    zoom = parse_zoom(request.GET.get("zoom"))
+    clustered = should_cluster(zoom)
+
+    etag = reports_etag({**filters, "zoom": zoom if clustered else None})
+    if etag in request.headers.get("If-None-Match", ""):
+        return HttpResponseNotModified(headers={"ETag": etag})
+
+    rows = filter_reports(
+        PropertyReport.objects.with_location().order_by(),
+        filters,
+    )
+
+    if clustered:
+        content = iter_cluster_collection(rows, zoom)
+    else:
+        content = iter_feature_collection(rows.values(*FEATURE_FIELDS))
+
+    response = StreamingHttpResponse(content, content_type="application/geo+json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+# ---------------- VECTOR TILES ----------------
+from django.http import Http404, HttpResponse
+from . import tiles
+
+
+@login_required
+def vector_tile(request, layer, z, x, y):
+    """Mapbox Vector Tile for the reports or stands layer."""
+    if layer not in tiles.LAYERS or not tiles.is_valid_tile(z, x, y):
+        raise Http404("Unknown tile")
+
+    response = HttpResponse(
+        tiles.get_tile(layer, z, x, y),
+        content_type="application/vnd.mapbox-vector-tile",
+    )
+    response["Cache-Control"] = "private, max-age=60"
+    return response
+
+
+# ---------------- REQUEST METRICS ----------------
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from . import metrics
+
+
+@staff_member_required
+def request_metrics(request):
+    """Per-view timings and query counts from this process's ring buffer."""
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request metrics",
+        "rows": metrics.view_summary(),
+        "recent": metrics.recent()[::-1][:50],
+        "buffer_size": metrics.BUFFER_SIZE,
+    }
+    return render(request, "admin/request_metrics.html", context)
+
+
+def prometheus_metrics(request):
+    """Prometheus scrape target: staff session or ``Bearer <METRICS_TOKEN>``."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    authorised = request.user.is_staff or (
+        token
+        and constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        )
     )
+    if not authorised:
+        return HttpResponseForbidden()
 
-    context = {"reports": reports}
+    return HttpResponse(
+        metrics.prometheus_text(), content_type="text/plain; version=0.0.4"
+    )
+
+
+# ---------------- EXPORTS ----------------
+from django.http import FileResponse
+
+
+@login_required
+@reads_from_replica
+def export_reports(request, fmt):
+    """Stream every report matching the dashboard filters as CSV/NDJSON/XLSX."""
+    if not exports.can_export(request.user):
+        return HttpResponseForbidden()
+    if fmt not in exports.available_formats():
+        raise Http404("Unknown export format")
+
+    filters = exports.parse_export_filters(request.GET)
+    rows = exports.export_rows(filters)
+    filename = exports.export_filename(filters, fmt)
+
+    if fmt == "xlsx":
+        # The zip container needs the whole sheet; build it on disk first
+        return FileResponse(
+            exports.xlsx_tempfile(rows),
+            as_attachment=True,
+            filename=filename,
+            content_type=exports.CONTENT_TYPES[fmt],
+        )
 
-    return render(request, "reporting/reports_map.html", context)
+    content = exports.iter_csv(rows) if fmt == "csv" else exports.iter_ndjson(rows)
+    response = StreamingHttpResponse(content, content_type=exports.CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
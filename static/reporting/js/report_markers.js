@@ -0,0 +1,107 @@
+/* ===============================
+   Report markers loaded from the GeoJSON API
+================================= */
+function escapeHtml(value) {
+    return String(value == null ? "" : value)
+        .replace(/&/g, "&amp;")
+        .replace(/</g, "&lt;")
+        .replace(/>/g, "&gt;")
+        .replace(/"/g, "&quot;")
+        .replace(/'/g, "&#39;");
+}
+
+function reportPopup(props, options) {
+    var html =
+        "<strong>House:</strong> " + escapeHtml(props.house) + "<br>" +
+        "<strong>Violation:</strong> " + escapeHtml(props.violation) + "<br>" +
+        "<strong>Status:</strong> " + escapeHtml(props.status) + "<br>";
+
+    if (options.showDate) {
+        html += "<strong>Date:</strong> " + escapeHtml(props.date) + "<br>";
+    }
+    if (options.detailUrl) {
+        html += '<a href="' + options.detailUrl.replace("__id__", props.id) +
+            '">View Details</a>';
+    }
+    return html;
+}
+
+function clusterMarker(feature, latlng) {
+    var count = feature.properties.count;
+    var size = count < 10 ? 30 : count < 100 ? 38 : 46;
+
+    return L.marker(latlng, {
+        icon: L.divIcon({
+            className: "report-cluster",
+            html: '<div style="width:' + size + 'px;height:' + size + 'px;' +
+                'line-height:' + size + 'px;border-radius:50%;text-align:center;' +
+                'background:rgba(13,110,253,0.8);color:#fff;font-weight:bold;">' +
+                count + "</div>",
+            iconSize: [size, size]
+        })
+    });
+}
+
+function loadReportMarkers(map, url, params, options) {
+    options = options || {};
+    var controller = null;
+
+    var layer = L.geoJSON(null, {
+        pointToLayer: function (feature, latlng) {
+            if (feature.properties.cluster) {
+                return clusterMarker(feature, latlng);
+            }
+            return L.marker(latlng);
+        },
+        onEachFeature: function (feature, marker) {
+            var props = feature.properties;
+            if (props.cluster) {
+                marker.bindTooltip(
+                    props.count + " reports<br>Mostly: " + escapeHtml(props.violation)
+                );
+                marker.on("click", function () {
+                    map.setView(marker.getLatLng(), map.getZoom() + 2);
+                });
+            } else {
+                marker.bindPopup(reportPopup(props, options));
+            }
+        }
+    }).addTo(map);
+
+    function refresh() {
+        var query = new URLSearchParams(params || {});
+
+        // Clustered mode: the server aggregates reports for the current view
+        if (options.cluster) {
+            query.set("bbox", map.getBounds().toBBoxString());
+            query.set("zoom", map.getZoom());
+        }
+
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+
+        fetch(url + "?" + query.toString(), {
+            credentials: "same-origin",
+            signal: controller.signal
+        })
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                layer.clearLayers();
+                layer.addData(data);
+            })
+            .catch(function (error) {
+                if (error.name !== "AbortError") {
+                    throw error;
+                }
+            });
+    }
+
+    refresh();
+    if (options.cluster) {
+        map.on("moveend", refresh);
+    }
+
+    return layer;
+}
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -58,6 +58,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.gis",  #
+    "django.contrib.postgres",  # full-text and trigram search
     "dashboard",
     "reporting",
     "amenities",
@@ -73,6 +74,10 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    "reporting.middleware.RequestMetricsMiddleware",
+    # Before sessions/auth, so their writes pin the client to the primary
+    "reporting.middleware.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -86,7 +91,8 @@ ROOT_URLCONF = "website.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to the request metrics
+        "BACKEND": "reporting.template_backends.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -120,6 +126,74 @@ DATABASES = {
     }
 }
 
+# Worker threads, each keeping its own connection, for the queries async
+# views run concurrently; see reporting.async_db
+ASYNC_DB_WORKERS = config("ASYNC_DB_WORKERS", default=4, cast=int)
+
+# Read replicas: comma-separated host[:port] list, added as replica1,
+# replica2, ... with the primary's name and credentials. Report list and
+# export reads go to a healthy replica (reporting.db_router); writes, the
+# requests after them and cached pages (dashboards, map data, tiles) use the
+# primary. Setting this to the primary's own host gives a second alias to
+# try the routing locally.
+DATABASE_REPLICAS = []
+for _i, _host in enumerate(
+    config("DATABASE_REPLICA_HOSTS", default="", cast=Csv()), start=1
+):
+    _hostname, _, _port = _host.partition(":")
+    DATABASES[f"replica{_i}"] = {
+        **DATABASES["default"],
+        "HOST": _hostname,
+        "PORT": _port or DATABASES["default"]["PORT"],
+        # Fail fast so a down replica only delays its health check
+        "OPTIONS": {"connect_timeout": 3},
+        # Tests read the replica aliases from the test database
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{_i}")
+
+DATABASE_ROUTERS = ["reporting.db_router.ReplicaRouter"]
+REPLICA_MAX_LAG_SECONDS = config("REPLICA_MAX_LAG_SECONDS", default=30, cast=float)
+REPLICA_CHECK_INTERVAL = config("REPLICA_CHECK_INTERVAL", default=10, cast=float)
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=30, cast=int)
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Dashboard numbers live in a file cache so every worker process sees the
+# same version bumps; swap in Redis/Memcached via the environment if needed.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "arlington-estate",
+    },
+    "dashboard": {
+        "BACKEND": config(
+            "DASHBOARD_CACHE_BACKEND",
+            default="django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": config(
+            "DASHBOARD_CACHE_LOCATION", default=str(BASE_DIR / "cache" / "dashboard")
+        ),
+    },
+}
+
+DASHBOARD_CACHE_ALIAS = "dashboard"
+# Rendition URLs and digests, shared with the image job workers
+RENDITION_CACHE_ALIAS = "dashboard"
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Request metrics (per process): /reports/metrics/ for staff, and
+# /reports/metrics/prometheus for scrapers sending "Bearer <METRICS_TOKEN>"
+REQUEST_METRICS_BUFFER = config("REQUEST_METRICS_BUFFER", default=1000, cast=int)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Queries slower than SLOW_QUERY_MS (0 = off) are stored in SlowQuery with
+# an EXPLAIN (ANALYZE, BUFFERS) plan; see `manage.py slow_queries`
+SLOW_QUERY_MS = config("SLOW_QUERY_MS", default=500, cast=int)
+SLOW_QUERY_LOG_SIZE = config("SLOW_QUERY_LOG_SIZE", default=5000, cast=int)
+SLOW_QUERY_EXPLAIN = config("SLOW_QUERY_EXPLAIN", default=True, cast=bool)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -160,6 +234,14 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploaded report images are compressed by `manage.py process_image_jobs`;
+# set IMAGE_JOBS_INLINE=True to process them in the request instead
+IMAGE_JOBS_INLINE = config("IMAGE_JOBS_INLINE", default=False, cast=bool)
+
+# New reports are linked to the nearest stand within this distance; a bad
+# GPS fix or a report from outside the estate gets no stand
+STAND_MATCH_MAX_METERS = config("STAND_MATCH_MAX_METERS", default=100, cast=float)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 